@@ -1,42 +1,51 @@
 """
 FIXED: Policy Architect with improved conflict detection and flexible LLM provider
 """
-import json
+import asyncio
 import re
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass
+import time
+from typing import List, Dict, Any, Optional, Tuple, Union
+from collections import OrderedDict
+from dataclasses import dataclass, field
 import hashlib
-from datetime import datetime
+from datetime import datetime, timezone
 import logging
 
-from backend.core.factory import LLMFactory
-from backend.schemas.models import PolicyRule, EPKBSchema, PolicyArchitectRequest
+from backend.core import jsonutil
+from backend.core.factory import DEFAULT_MAX_TOKENS, LLMFactory, LLMResponse
+from backend.schemas.models import EPKBSchema
 from backend.services.db import DatabaseService
 
+# Optional compiled JSON Schema validator for fast shape checks
+try:
+    import fastjsonschema
+    FASTJSONSCHEMA_AVAILABLE = True
+except ImportError:
+    FASTJSONSCHEMA_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
-@dataclass
-class PolicyAnalysisResult:
-    """Result of policy analysis"""
-    policy_id: str
-    policy_name: str
-    rules_created: int
-    conflicts_detected: List[Dict]
-    timestamp: datetime
+# Maximum number of policy texts converted in a single LLM call
+MAX_POLICY_BATCH = 8
 
-class PolicyArchitect:
-    """
-    Agent A: Policy Architect
-    Converts natural language governance requirements to structured JSON policies
-    """
-    
-    def __init__(self):
-        self.llm_provider = None
-        self.db_service = None
-        self.is_initialized = False
-        
-        # Policy Architect system prompt
-        self.architect_prompt = """You are the Policy Architect for OrchestraGuard, a multi-agent governance system.
+# Output tokens budgeted per policy in a batched conversion reply
+_TOKENS_PER_POLICY = DEFAULT_MAX_TOKENS
+
+# Characters stripped from policy names when building policy ID slugs
+_SLUG_RE = re.compile(r'[^a-z0-9]')
+
+# Optional markdown code fence around LLM JSON output
+_FENCE_RE = re.compile(r'^(?:```(?:json)?)?\s*(.*?)\s*(?:```)?$', re.S)
+
+# EPKB shape validator compiled once from the Pydantic schema; Pydantic
+# remains the source of truth, this only rejects malformed output cheaply
+_EPKB_VALIDATOR = (
+    fastjsonschema.compile(EPKBSchema.model_json_schema()) if FASTJSONSCHEMA_AVAILABLE else None
+)
+
+# Policy Architect system prompt. Kept static and sent as the system prompt
+# so providers can reuse the cached prefix across calls.
+ARCHITECT_SYSTEM_PROMPT = """You are the Policy Architect for OrchestraGuard, a multi-agent governance system.
 
 Your task is to convert natural language governance requirements into structured, executable JSON policy rules.
 
@@ -46,19 +55,25 @@ CRITICAL RULES:
 3. Target tool regex MUST be specific enough to match relevant tools but not over-broad
 4. Condition logic MUST be valid Python that can evaluate to True/False
 5. Severity MUST be HIGH, MEDIUM, or LOW based on potential impact
+6. You may receive several numbered requirements ("Policy 1: ...", "Policy 2: ...").
+   Return exactly one entry in "policies" per requirement, in the same order.
 
 OUTPUT SCHEMA:
 {
-  "policy_name": "string (concise descriptive name)",
-  "version": "1.0",
-  "rules": [
+  "policies": [
     {
-      "rule_id": "string (e.g., DP-001)",
-      "description": "string (human-readable rule)",
-      "target_tool_regex": "string (e.g., 'Slack_API_.*' or 'GitHub_API_Create.*')",
-      "condition_logic": "string (Python-evaluatable, e.g.: \"tool_arguments.get('channel') == '#general'\")",
-      "severity": "HIGH|MEDIUM|LOW",
-      "action_on_violation": "BLOCK|FLAG"
+      "policy_name": "string (concise descriptive name)",
+      "version": "1.0",
+      "rules": [
+        {
+          "rule_id": "string (e.g., DP-001)",
+          "description": "string (human-readable rule)",
+          "target_tool_regex": "string (e.g., 'Slack_API_.*' or 'GitHub_API_Create.*')",
+          "condition_logic": "string (Python-evaluatable, e.g.: \"tool_arguments.get('channel') == '#general'\")",
+          "severity": "HIGH|MEDIUM|LOW",
+          "action_on_violation": "BLOCK|FLAG"
+        }
+      ]
     }
   ]
 }
@@ -84,7 +99,36 @@ EXAMPLES:
      "action_on_violation": "BLOCK"
    }
 
-Now convert the following governance requirement:"""
+The user message contains the governance requirements to convert. Output ONLY valid JSON."""
+
+# Trailing instruction appended after the numbered requirements
+_PROMPT_SUFFIX = "Output ONLY valid JSON:"
+
+@dataclass(slots=True, frozen=True)
+class PolicyAnalysisResult:
+    """Result of policy analysis"""
+    policy_id: str
+    policy_name: str
+    rules_created: int
+    conflicts_detected: List[Dict]
+    timestamp: datetime
+    created_policies: List[Dict] = field(default_factory=list)  # Stored policy rows
+
+class PolicyArchitect:
+    """
+    Agent A: Policy Architect
+    Converts natural language governance requirements to structured JSON policies
+    """
+    
+    def __init__(self):
+        self.llm_provider = None
+        self.db_service = None
+        self.is_initialized = False
+        
+        # Exact-match cache of LLM responses keyed by prompt hash
+        self._response_cache: "OrderedDict[str, Tuple[float, LLMResponse]]" = OrderedDict()  # (time.monotonic(), response)
+        self._response_cache_ttl = 3600  # seconds
+        self._response_cache_max_size = 1024
     
     async def initialize(self):
         """Initialize the Policy Architect"""
@@ -108,138 +152,284 @@ Now convert the following governance requirement:"""
         
         try:
             # Step 1: Convert policy text to structured rules using LLM
-            structured_rules = await self._convert_to_structured_rules(policy_text)
-            
-            # Step 2: Validate the rules
-            validated_policy = EPKBSchema(**structured_rules)
+            structured_rules = (await self._convert_to_structured_rules([policy_text]))[0]
+            if isinstance(structured_rules, Exception):
+                raise structured_rules
             
-            # Step 3: Check for conflicts with existing policies using database
-            conflicts = []
-            for rule in validated_policy.rules:
-                rule_dict = rule.dict()
-                rule_conflicts = await self.db_service.check_policy_conflicts(rule_dict)
-                conflicts.extend(rule_conflicts)
-            
-            # Step 4: Generate policy ID
-            policy_id = self._generate_policy_id(validated_policy.policy_name, policy_text)
-            
-            # Step 5: Store in database (if no critical conflicts)
-            rules_created = 0
-            if not self._has_critical_conflicts(conflicts):
-                rules_created = await self._store_policy(validated_policy)
-            else:
-                logger.warning(f"Policy '{validated_policy.policy_name}' has critical conflicts, not storing")
-            
-            return PolicyAnalysisResult(
-                policy_id=policy_id,
-                policy_name=validated_policy.policy_name,
-                rules_created=rules_created,
-                conflicts_detected=conflicts,
-                timestamp=datetime.utcnow()
-            )
+            return await self._process_structured_policy(structured_rules, policy_text)
             
         except Exception as e:
             logger.error(f"Policy analysis failed: {e}")
             raise Exception(f"Policy analysis failed: {str(e)}")
     
-    async def _convert_to_structured_rules(self, policy_text: str) -> Dict[str, Any]:
-        """Use LLM to convert natural language to structured rules"""
-        full_prompt = f"{self.architect_prompt}\n\n{policy_text}\n\nOutput ONLY valid JSON:"
+    async def analyze_policies_batch(
+        self,
+        policy_texts: List[str]
+    ) -> List[Union[PolicyAnalysisResult, Exception]]:
+        """
+        Analyze several natural language policies, converting up to
+        MAX_POLICY_BATCH of them per LLM call.
+        Returns one entry per input text: the analysis result, or the
+        exception that prevented that policy from being processed.
+        """
+        if not self.is_initialized:
+            await self.initialize()
+        
+        results: List[Union[PolicyAnalysisResult, Exception]] = []
+        for start in range(0, len(policy_texts), MAX_POLICY_BATCH):
+            chunk = policy_texts[start:start + MAX_POLICY_BATCH]
+            try:
+                structured_batch = await self._convert_to_structured_rules(chunk)
+            except Exception as e:
+                logger.error(f"Batched policy conversion failed: {e}")
+                results.extend(Exception(f"Policy analysis failed: {str(e)}") for _ in chunk)
+                continue
+            
+            # Policies are stored sequentially so later ones see conflicts with earlier ones
+            for policy_text, structured_rules in zip(chunk, structured_batch):
+                try:
+                    if isinstance(structured_rules, Exception):
+                        raise structured_rules
+                    results.append(
+                        await self._process_structured_policy(structured_rules, policy_text)
+                    )
+                except Exception as e:
+                    logger.error(f"Policy analysis failed: {e}")
+                    results.append(Exception(f"Policy analysis failed: {str(e)}"))
+        
+        return results
+    
+    async def _process_structured_policy(
+        self,
+        validated_policy: EPKBSchema,
+        policy_text: str
+    ) -> PolicyAnalysisResult:
+        """Conflict-check and store a single policy (validated in _validate_structured_policy)"""
+        # Step 3: Check for conflicts with existing policies using database
+        rule_dicts = [rule.model_dump(exclude_none=True) for rule in validated_policy.rules]
+        conflicts = await self.db_service.check_policy_conflicts_batch(rule_dicts)
+        
+        # Step 4: Generate policy ID
+        policy_id = self._generate_policy_id(validated_policy.policy_name, policy_text)
+        
+        # Step 5: Store in database (if no critical conflicts)
+        created_policies: List[Dict] = []
+        if not self._has_critical_conflicts(conflicts):
+            created_policies = await self._store_policy(validated_policy, rule_dicts)
+        else:
+            logger.warning(f"Policy '{validated_policy.policy_name}' has critical conflicts, not storing")
+        
+        return PolicyAnalysisResult(
+            policy_id=policy_id,
+            policy_name=validated_policy.policy_name,
+            rules_created=len(created_policies),
+            conflicts_detected=conflicts,
+            timestamp=datetime.now(timezone.utc),
+            created_policies=created_policies
+        )
+    
+    async def _convert_to_structured_rules(self, policy_texts: List[str]) -> List[Any]:
+        """
+        Use LLM to convert a batch of natural language policies to structured rules.
+        Returns one entry per input text: the validated policy, or the
+        exception raised while parsing that entry. The response is cached
+        only when every entry validates.
+        """
+        # Static instructions travel in the system prompt; build the per-call
+        # prompt with a single join over the numbered requirements
+        prompt = "\n\n".join([
+            *(f"Policy {index}: {text}" for index, text in enumerate(policy_texts, start=1)),
+            _PROMPT_SUFFIX
+        ])
         
         try:
-            response = await self.llm_provider.invoke(
-                prompt=full_prompt,
-                system_prompt="You are a precise policy architect. Output only valid JSON.",
-                temperature=0.1  # Low temperature for consistent output
+            response = await self._cached_invoke(
+                prompt=prompt,
+                system_prompt=ARCHITECT_SYSTEM_PROMPT,
+                temperature=0.1,  # Low temperature for consistent output
+                cache_control={"type": "ephemeral"},
+                # Room for every policy, so a batch isn't cut off mid-JSON
+                max_tokens=_TOKENS_PER_POLICY * len(policy_texts)
             )
             
             # Parse JSON response
-            # Sometimes LLMs add markdown code blocks
-            content = response.content.strip()
-            
-            # Remove markdown code blocks if present
-            if content.startswith("```json"):
-                content = content[7:]
-            elif content.startswith("```"):
-                content = content[3:]
-            
-            if content.endswith("```"):
-                content = content[:-3]
-            
-            # Clean up any leading/trailing whitespace
-            content = content.strip()
+            # Sometimes LLMs add markdown code blocks; strip them in one pass
+            content = _FENCE_RE.match(response.content.strip()).group(1)
             
-            # Parse JSON
-            structured_data = json.loads(content)
+            # Parse JSON once for the whole batch
+            parsed = jsonutil.loads(content)
             
-            # Validate basic structure
-            if "policy_name" not in structured_data or "rules" not in structured_data:
-                raise ValueError("LLM output missing required fields: 'policy_name' or 'rules'")
-            
-            # Ensure version exists
-            if "version" not in structured_data:
-                structured_data["version"] = "1.0"
+            # Accept the batched envelope, a bare list, or a single policy object
+            if isinstance(parsed, dict) and "policies" in parsed:
+                policies = parsed["policies"]
+            elif isinstance(parsed, list):
+                policies = parsed
+            else:
+                policies = [parsed]
             
-            logger.info(f"Successfully parsed policy with {len(structured_data['rules'])} rules")
-            return structured_data
+            if not isinstance(policies, list) or len(policies) != len(policy_texts):
+                raise ValueError(
+                    f"LLM returned {len(policies) if isinstance(policies, list) else 'no'} "
+                    f"policies for {len(policy_texts)} requirements"
+                )
             
-        except json.JSONDecodeError as e:
+        except (jsonutil.JSONDecodeError, ValueError) as e:
+            if len(policy_texts) > 1:
+                # Fall back to one call per policy so a single bad batch doesn't lose everything
+                logger.warning(f"Batched policy conversion failed ({e}), retrying individually")
+                fallback = await asyncio.gather(
+                    *(self._convert_to_structured_rules([text]) for text in policy_texts),
+                    return_exceptions=True
+                )
+                return [item if isinstance(item, Exception) else item[0] for item in fallback]
             logger.error(f"LLM output is not valid JSON: {e}")
             raise ValueError(f"LLM output is not valid JSON: {e}")
         except Exception as e:
             logger.error(f"LLM conversion failed: {str(e)}")
             raise Exception(f"LLM conversion failed: {str(e)}")
+        
+        # Validate each entry independently so one malformed policy doesn't fail the batch
+        results: List[Any] = []
+        for structured_data in policies:
+            try:
+                results.append(self._validate_structured_policy(structured_data))
+            except ValueError as e:
+                logger.error(f"Skipping malformed policy in LLM output: {e}")
+                results.append(e)
+        
+        # A re-submitted text should get a fresh answer, not the same bad output
+        if not any(isinstance(result, Exception) for result in results):
+            self._cache_response(ARCHITECT_SYSTEM_PROMPT, prompt, response)
+        
+        return results
     
-    def _has_critical_conflicts(self, conflicts: List[Dict]) -> bool:
-        """Check if there are critical conflicts that should block policy creation"""
-        for conflict in conflicts:
-            if conflict.get("conflict_type") == "action_conflict":
-                # High severity conflicts are critical
-                if conflict.get("severity") == "HIGH":
-                    return True
-                # BLOCK vs ALLOW conflicts are always critical
-                if conflict.get("action") == "BLOCK":
-                    return True
-        return False
+    def _validate_structured_policy(self, structured_data: Any) -> EPKBSchema:
+        """Check and validate a single structured policy from the LLM"""
+        if not isinstance(structured_data, dict):
+            raise ValueError("LLM output policy is not a JSON object")
+        
+        # Validate basic structure
+        if "policy_name" not in structured_data or "rules" not in structured_data:
+            raise ValueError("LLM output missing required fields: 'policy_name' or 'rules'")
+        
+        if not isinstance(structured_data["rules"], list):
+            raise ValueError("LLM output field 'rules' must be a list")
+        
+        # Ensure version exists
+        if "version" not in structured_data:
+            structured_data["version"] = "1.0"
+        
+        if _EPKB_VALIDATOR is not None:
+            try:
+                _EPKB_VALIDATOR(structured_data)
+            except fastjsonschema.JsonSchemaException as e:
+                raise ValueError(f"LLM output failed schema validation at {getattr(e, 'name', 'data')}: {e}")
+        
+        # pydantic's ValidationError is a ValueError, so callers catch it alike
+        validated_policy = EPKBSchema.model_validate(structured_data)
+        
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Successfully parsed policy with %s rules", len(validated_policy.rules))
+        return validated_policy
+    
+    def _response_cache_key(self, system_prompt: str, prompt: str) -> str:
+        """Create response cache key from the full prompt"""
+        return hashlib.blake2b(f"{system_prompt}\x00{prompt}".encode("utf-8")).hexdigest()
+    
+    async def _cached_invoke(self, prompt: str, system_prompt: str, **kwargs) -> LLMResponse:
+        """
+        Invoke the LLM, reusing a recent response for an identical prompt.
+        Responses are stored by _cache_response once they have validated.
+        """
+        key = self._response_cache_key(system_prompt, prompt)
+        cached = self._response_cache.get(key)
+        
+        if cached:
+            if time.monotonic() - cached[0] < self._response_cache_ttl:
+                self._response_cache.move_to_end(key)
+                logger.debug("Returning cached LLM response for %s", key[:16])
+                return cached[1]
+            del self._response_cache[key]
+        
+        return await self.llm_provider.invoke(prompt=prompt, system_prompt=system_prompt, **kwargs)
     
-    async def _store_policy(self, policy: EPKBSchema) -> int:
-        """Store policy rules in database"""
-        rules_created = 0
+    def _cache_response(self, system_prompt: str, prompt: str, response: LLMResponse) -> None:
+        """Cache a validated response, evicting the least recently used entries"""
+        key = self._response_cache_key(system_prompt, prompt)
+        if key in self._response_cache:
+            return  # Served from the cache; keep its original TTL
         
-        for rule in policy.rules:
-            # Prepare policy data
-            policy_data = {
+        self._response_cache[key] = (time.monotonic(), response)
+        while len(self._response_cache) > self._response_cache_max_size:
+            self._response_cache.popitem(last=False)
+    
+    def _has_critical_conflicts(self, conflicts: List[Dict]) -> bool:
+        """
+        Check if there are critical conflicts that should block policy creation:
+        action conflicts that are HIGH severity or involve a BLOCK rule
+        """
+        return any(
+            conflict.get("conflict_type") == "action_conflict"
+            and (conflict.get("severity") == "HIGH" or conflict.get("action") == "BLOCK")
+            for conflict in conflicts
+        )
+    
+    async def _store_policy(self, policy: EPKBSchema, rule_dicts: List[Dict[str, Any]]) -> List[Dict]:
+        """
+        Store policy rules in database, reusing the rule dicts dumped for
+        conflict checks. Returns the stored policy rows.
+        """
+        # Prepare policy data
+        policy_data_list = [
+            {
                 "name": f"{policy.policy_name} - {rule.rule_id}",
-                "rules": rule.dict(),
+                "rules": rule_dict,
                 "is_active": True
             }
-            
-            try:
-                # Store in database
-                result = await self.db_service.create_policy(policy_data)
-                if result:
-                    rules_created += 1
-                    logger.info(f"Created policy rule: {rule.rule_id}")
-                else:
-                    logger.warning(f"Failed to create policy rule: {rule.rule_id}")
-            except Exception as e:
-                logger.error(f"Error storing policy rule {rule.rule_id}: {e}")
+            for rule, rule_dict in zip(policy.rules, rule_dicts)
+        ]
+        
+        # Store all rules with one insert; if that keeps failing (e.g. one bad
+        # row), fall back to overlapping per-rule inserts so the rest still land
+        try:
+            created = await self.db_service.create_policies(policy_data_list)
+        except Exception as e:
+            logger.warning(f"Bulk insert of {len(policy_data_list)} rules failed, inserting one by one: {e}")
+        else:
+            logger.info(f"Successfully stored {len(created)} rules from policy '{policy.policy_name}'")
+            return created
+        
+        results = await asyncio.gather(
+            *(self.db_service.create_policy(policy_data) for policy_data in policy_data_list),
+            return_exceptions=True
+        )
+        
+        created = []
+        for rule, result in zip(policy.rules, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error storing policy rule {rule.rule_id}: {result}")
+            elif result:
+                created.append(result)
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Created policy rule: %s", rule.rule_id)
+            else:
+                logger.warning(f"Failed to create policy rule: {rule.rule_id}")
         
-        logger.info(f"Successfully stored {rules_created} rules from policy '{policy.policy_name}'")
-        return rules_created
+        logger.info(f"Successfully stored {len(created)} rules from policy '{policy.policy_name}'")
+        return created
     
     def _generate_policy_id(self, policy_name: str, policy_text: str) -> str:
         """Generate unique policy ID"""
         # Create hash from policy name and text
-        hash_input = f"{policy_name}:{policy_text}"
-        hash_digest = hashlib.md5(hash_input.encode()).hexdigest()[:8]
+        hash_input = f"{policy_name}:{policy_text}".encode("utf-8")
+        hash_digest = hashlib.blake2b(hash_input, digest_size=4).hexdigest()
         
         # Create readable ID
-        name_slug = re.sub(r'[^a-z0-9]', '', policy_name.lower())[:10]
+        name_slug = _SLUG_RE.sub('', policy_name.lower())[:10]
         return f"pol_{name_slug}_{hash_digest}"
     
     async def close(self):
         """Cleanup"""
         if self.llm_provider:
-            await self.llm_provider.close()
+            await LLMFactory.release_provider(self.llm_provider)
         logger.info("👋 Policy Architect shutdown")
\ No newline at end of file
@@ -0,0 +1,194 @@
+"""
+Safe compilation and evaluation of policy condition_logic expressions
+"""
+import ast
+from functools import lru_cache
+from types import CodeType
+from typing import Any, Dict, Optional
+
+# Names a condition may read; comprehension variables are allowed as well
+CONDITION_NAMES = {"tool_arguments", "user_context"}
+
+# The only builtins visible to a condition ("lower" is used by the sample policies)
+SAFE_BUILTINS: Dict[str, Any] = {
+    "str": str,
+    "int": int,
+    "float": float,
+    "bool": bool,
+    "len": len,
+    "any": any,
+    "all": all,
+    "min": min,
+    "max": max,
+    "abs": abs,
+    "lower": lambda value: str(value).lower(),
+}
+
+# Methods a condition may call on values
+SAFE_METHODS = {
+    "get", "lower", "upper", "strip", "startswith", "endswith",
+    "split", "keys", "values", "items", "count",
+}
+
+# AST nodes allowed in a condition
+_ALLOWED_NODES = (
+    ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not, ast.USub, ast.UAdd,
+    ast.BinOp, ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod,
+    ast.Compare, ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE,
+    ast.In, ast.NotIn, ast.Is, ast.IsNot, ast.IfExp,
+    ast.Name, ast.Load, ast.Store, ast.Constant, ast.Attribute, ast.Call,
+    ast.Subscript, ast.Slice, ast.List, ast.Tuple, ast.Set, ast.Dict,
+    ast.GeneratorExp, ast.ListComp, ast.SetComp, ast.comprehension,
+)
+
+# Largest integer a condition may multiply a looked-up value by. Repetition
+# is only allowed in that form, so a string or list can't be grown past
+# this factor of the action's own data
+_MAX_MULT_CONSTANT = 10_000
+
+# Builtins whose result is always a number
+_NUMERIC_BUILTINS = {"len", "int", "float", "abs", "bool"}
+
+_ARITHMETIC_OPS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod)
+
+def _is_numeric(node: ast.AST) -> bool:
+    """True if the expression can only evaluate to a number (or raise)"""
+    if isinstance(node, ast.Constant):
+        return isinstance(node.value, (int, float))
+    if isinstance(node, ast.Compare):
+        return True
+    if isinstance(node, ast.UnaryOp):
+        return isinstance(node.op, ast.Not) or _is_numeric(node.operand)
+    if isinstance(node, ast.BinOp):
+        return (
+            isinstance(node.op, _ARITHMETIC_OPS)
+            and _is_numeric(node.left)
+            and _is_numeric(node.right)
+        )
+    if isinstance(node, ast.BoolOp):
+        return all(_is_numeric(value) for value in node.values)
+    if isinstance(node, ast.IfExp):
+        return _is_numeric(node.body) and _is_numeric(node.orelse)
+    if isinstance(node, ast.Call):
+        return isinstance(node.func, ast.Name) and node.func.id in _NUMERIC_BUILTINS
+    return False
+
+def _is_lookup(node: ast.AST) -> bool:
+    """True for a plain value read: a name, a subscript of one, or .get() on one"""
+    if isinstance(node, ast.Name):
+        return True
+    if isinstance(node, ast.Subscript):
+        return _is_lookup(node.value)
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute):
+        return node.func.attr == "get" and _is_lookup(node.func.value)
+    return False
+
+class UnsafeConditionError(ValueError):
+    """Raised when condition_logic uses syntax outside the allow-list"""
+    pass
+
+class _ConditionValidator(ast.NodeVisitor):
+    """Reject any node, name, call or attribute that is not explicitly allowed"""
+
+    def __init__(self):
+        self.bound_names = set()
+
+    def generic_visit(self, node: ast.AST) -> None:
+        if not isinstance(node, _ALLOWED_NODES):
+            raise UnsafeConditionError(f"Disallowed syntax in condition: {type(node).__name__}")
+        super().generic_visit(node)
+
+    def visit_comprehension(self, node: ast.comprehension) -> None:
+        # Comprehension targets become readable names (e.g. 'for pii in [...]')
+        for target in ast.walk(node.target):
+            if isinstance(target, ast.Name):
+                self.bound_names.add(target.id)
+        self.generic_visit(node)
+
+    def visit_Name(self, node: ast.Name) -> None:
+        if isinstance(node.ctx, ast.Load) and node.id not in (
+            CONDITION_NAMES | SAFE_BUILTINS.keys() | self.bound_names
+        ):
+            raise UnsafeConditionError(f"Unknown name in condition: {node.id}")
+        self.generic_visit(node)
+
+    def visit_Attribute(self, node: ast.Attribute) -> None:
+        if node.attr not in SAFE_METHODS:
+            raise UnsafeConditionError(f"Disallowed attribute in condition: {node.attr}")
+        self.generic_visit(node)
+
+    def visit_BinOp(self, node: ast.BinOp) -> None:
+        # "*" repeats strings and lists; allow it only between numbers, or
+        # as a bounded constant times a looked-up value, so nested
+        # repetition (e.g. str(x * 9999) * 9999) can't compound
+        if isinstance(node.op, ast.Mult) and not (
+            _is_numeric(node.left) and _is_numeric(node.right)
+        ):
+            for constant, other in ((node.left, node.right), (node.right, node.left)):
+                if (
+                    isinstance(constant, ast.Constant)
+                    and _is_numeric(constant)
+                    and _is_lookup(other)
+                ):
+                    if abs(constant.value) > _MAX_MULT_CONSTANT:
+                        raise UnsafeConditionError(
+                            f"Multiplication constants above {_MAX_MULT_CONSTANT} "
+                            f"are not allowed in conditions"
+                        )
+                    break
+            else:
+                raise UnsafeConditionError(
+                    "Multiplication in conditions must be numeric or a constant "
+                    "times a looked-up value"
+                )
+        self.generic_visit(node)
+
+    def visit_Call(self, node: ast.Call) -> None:
+        if node.keywords:
+            raise UnsafeConditionError("Keyword arguments are not allowed in conditions")
+        if not isinstance(node.func, (ast.Name, ast.Attribute)):
+            raise UnsafeConditionError("Only builtin functions and safe methods can be called")
+        self.generic_visit(node)
+
+@lru_cache(maxsize=2048)
+def compile_condition(source: str, rule_id: str = "condition") -> CodeType:
+    """
+    Parse, validate and compile condition_logic once
+
+    Args:
+        source: Python expression from PolicyRule.condition_logic
+        rule_id: Rule ID used as the code object's filename
+
+    Returns:
+        Compiled code object for evaluate_condition
+    """
+    try:
+        tree = ast.parse(source.strip(), mode="eval")
+    except SyntaxError as e:
+        raise UnsafeConditionError(f"Invalid Python syntax in condition: {e}")
+
+    # Comprehension targets must be collected before names are checked
+    validator = _ConditionValidator()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.comprehension):
+            validator.visit_comprehension(node)
+    validator.visit(tree)
+
+    return compile(tree, f"<rule:{rule_id}>", "eval")
+
+def build_condition_scope(
+    tool_arguments: Optional[Dict[str, Any]],
+    user_context: Optional[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Globals for evaluating conditions against one action; reusable across its rules"""
+    # Names go in globals so comprehension scopes can see them too
+    return {
+        "__builtins__": SAFE_BUILTINS,
+        "tool_arguments": tool_arguments or {},
+        "user_context": user_context or {},
+    }
+
+def evaluate_condition(code: CodeType, scope: Dict[str, Any]) -> bool:
+    """Evaluate a compiled condition with no access to real builtins"""
+    # Conditions can't assign, so one scope serves every rule of an action
+    return bool(eval(code, scope))
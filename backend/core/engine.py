@@ -2,30 +2,118 @@
 FIXED: Complete ReasoningEngine with proper policy parsing and LLM retry logic
 """
 
+import array
 import asyncio
-import json
+import os
+import random
 import re
-from typing import Dict, Any, List, Optional
-from datetime import datetime
+import time
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Pattern, Set, Tuple, Type
+from datetime import datetime, timezone
 import hashlib
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
 import logging
 
-from backend.core.factory import LLMFactory, LLMResponse
+from pydantic import BaseModel, ValidationError
+
+from backend.core import jsonutil
+from backend.core.conditions import (
+    compile_condition,
+    build_condition_scope,
+    evaluate_condition,
+    UnsafeConditionError,
+)
+from backend.core.factory import (
+    CircuitBreaker,
+    LLMFactory,
+    LLMResponse,
+    ProviderUnavailableError,
+)
 from backend.schemas.models import (
     InterceptedAction,
     Decision,
     PolicyRule,
-    EPKBSchema,
     DecisionEnum,
     SeverityEnum,
+    ActionOnViolationEnum,
+    LLMDecisionOutput,
+    LLMBatchDecisionOutput,
 )
 from backend.services.db import DatabaseService
 from backend.services.notify import NotificationService
 
+# Conditional import - google-re2 matches policy patterns in linear time when installed
+try:
+    import re2
+    RE2_AVAILABLE = True
+except ImportError:
+    RE2_AVAILABLE = False
+
+# Severity ordering used when several locally evaluated rules fire
+_SEVERITY_RANK = {SeverityEnum.LOW: 1, SeverityEnum.MEDIUM: 2, SeverityEnum.HIGH: 3}
+
+# Fixed text around the action JSON in the reasoner user prompt
+_USER_PROMPT_PRE = (
+    "\n\nEvaluate this intercepted action against the provided policies:\n\n```json\n"
+)
+_USER_PROMPT_POST = "\n```\nProvide your decision in the required JSON format."
+
+# Fixed text around the action list in a batched reasoner user prompt
+_BATCH_PROMPT_PRE = (
+    "\n\nEvaluate each of these intercepted actions against the policy rules "
+    "listed in its \"rule_ids\":\n\n```json\n"
+)
+_BATCH_PROMPT_POST = (
+    "\n```\nReturn a single JSON object {\"results\": [...]} with one entry per action: "
+    "the required JSON format plus that action's \"action_id\"."
+)
+
+# Bytes of action JSON per size class when binning batched LLM evaluations
+_LLM_BATCH_SIZE_BIN = 512
+
+# Policy sets up to this size are indexed on the event loop; larger ones in a thread
+_INLINE_POLICY_BUILD_LIMIT = 64
+
+# Patterns add_policies may append outside the trie (each matched on its own)
+# before the next merge rebuilds the whole index instead
+_INCREMENTAL_PATTERN_LIMIT = 32
+
+# Slots in the decision statistics counter array
+_STAT_TOTAL, _STAT_ALLOW, _STAT_BLOCK, _STAT_FLAG = range(4)
+_DECISION_STAT_INDEX = {
+    DecisionEnum.ALLOW: _STAT_ALLOW,
+    DecisionEnum.BLOCK: _STAT_BLOCK,
+    DecisionEnum.FLAG: _STAT_FLAG,
+}
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Patterns that cannot be embedded in the combined regex: backreferences
+# (group numbers shift), and global inline flags (must start the pattern)
+_UNFUSABLE_RE = re.compile(r"\\[1-9]|\(\?P=|^\(\?[aiLmsux]+\)")
+
+# Patterns that only test a literal prefix: optional "^", literal characters
+# (escaped dots included), optional trailing ".*"
+_LITERAL = r"(?:[\w\-/:@]|\\\.)*"
+_LITERAL_PREFIX_RE = re.compile(rf"^\^?({_LITERAL})(?:\.\*)?$")
+
+# Literal prefixes with one group of literal alternatives, e.g. "^db\.(write|delete)"
+_LITERAL_ALTERNATION_RE = re.compile(
+    rf"^\^?({_LITERAL})\((?:\?:)?({_LITERAL}(?:\|{_LITERAL})*)\)({_LITERAL})(?:\.\*)?$"
+)
+
+
+@lru_cache(maxsize=4096)
+def _parse_policy_rule(rule_json: str) -> PolicyRule:
+    """
+    Validate a rule from its canonical JSON fields. Rules that are unchanged
+    across policy reloads reuse the validated object; invalid rules raise
+    every time and are not cached.
+    """
+    return PolicyRule(**jsonutil.loads(rule_json))
+
 
 class ReasoningEngine:
     """
@@ -36,54 +124,126 @@ class ReasoningEngine:
     4. Improved applied rules logic and JSON parsing
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        llm_timeout: float = 8.0,
+        cache_violations: bool = True,
+        llm_concurrency: Optional[int] = None,
+        llm_max_retries: int = 3,
+    ):
         self.llm_provider = None
         self.db_service: Optional[DatabaseService] = None
         self.notify_service: Optional[NotificationService] = None
 
-        # Cache for policies with TTL
-        self._policy_cache: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        # LLM decisions shared by identical concurrent/recent actions. Keys are
+        # a blake2b digest of the relevant rules' content (_rule_set_key), the
+        # tool, source agent, tool arguments and user context, so rules merged
+        # by add_policies leave unrelated entries valid; a full reload resets
+        # the cache. BLOCK/FLAG results are only cached when cache_violations is set.
+        self._inflight: Dict[bytes, asyncio.Task] = {}
+        self._decision_cache: "OrderedDict[bytes, Tuple[float, Decision]]" = OrderedDict()
+        self._decision_cache_ttl = 30  # seconds
+        self._decision_cache_max_size = 10_000
+        self._cache_violations = cache_violations
+
+        # Audit writes run in the background: queued and flushed in batches
+        # once initialized, otherwise as tracked tasks
+        self._pending_logs: Set[asyncio.Task] = set()
+        self._log_queue: asyncio.Queue = asyncio.Queue(maxsize=10_000)
+        self._log_batch_size = 500
+        self._log_flush_interval = 0.1  # seconds to gather a batch after its first record
+        self._log_flusher: Optional[asyncio.Task] = None
+
+        # BLOCK alerts have their own queue and sender, so a backlog of
+        # audit writes never delays them
+        self._alert_queue: asyncio.Queue = asyncio.Queue()
+        self._alert_sender: Optional[asyncio.Task] = None
+
+        # Per-attempt LLM timeout in seconds; a stuck call is retried instead of awaited
+        self._llm_timeout = llm_timeout
+        self._llm_max_retries = llm_max_retries
+
+        # Cap on concurrent provider calls (ORCHESTRA_LLM_CONCURRENCY, default 16);
+        # tune to what the provider serves in parallel
+        if llm_concurrency is None:
+            llm_concurrency = int(os.getenv("ORCHESTRA_LLM_CONCURRENCY", "16"))
+        self._llm_slots = asyncio.Semaphore(llm_concurrency)
+
+        # Shared across all LLM calls: fast-fail while the provider is down
+        self._llm_breaker = CircuitBreaker(fail_threshold=20, window=10.0, cooldown=30.0)
+        # Monotonic deadline set by a rate-limited reply; every caller waits it out
+        # instead of sending a request the provider would reject anyway
+        self._cooldown_until = 0.0
+
+        # LLM evaluations arriving within a short window are sent as one
+        # batched prompt once initialized; otherwise each action is its own call
+        self._llm_batch_queue: asyncio.Queue = asyncio.Queue()
+        self._llm_batch_max_size = 32
+        self._llm_batch_window = 0.02  # seconds
+        self._llm_batcher: Optional[asyncio.Task] = None
+        self._llm_batch_tasks: Set[asyncio.Task] = set()
+
+        # Cache for policies with TTL: (compiled target_tool_regex, entries)
+        self._policy_cache: List[Tuple[Pattern[str], List[Dict[str, Any]]]] = []
+        # Literal-prefix patterns as a dict-of-dicts trie; "" holds entry indices
+        self._prefix_trie: Dict[str, Any] = {}
+        # Remaining patterns go into an RE2 set when available (set index ->
+        # entry index), then one combined regex where group "p{i}" is set when
+        # entry i matches, then individual matching
+        self._pattern_set: Optional[Any] = None
+        self._pattern_set_indices: List[int] = []
+        self._combined_re: Optional[Pattern[str]] = None
+        self._unfused_patterns: List[Tuple[int, Pattern[str]]] = []
         self._cache_timestamp: Optional[datetime] = None
+        self._cache_monotonic: Optional[float] = None  # For TTL checks
         self._cache_ttl = 60  # Cache policies for 60 seconds
-
-        # Decision statistics
-        self._decision_stats = {
-            "total": 0,
-            "allow": 0,
-            "block": 0,
-            "flag": 0,
-        }
-
-        # Master System Prompt with strict applied rules requirement
-        self.master_prompt = """You are the Ethical Reasoner for OrchestraGuard. Your job is to evaluate intercepted agent actions against enterprise policies.
-
-CRITICAL RULES:
-1. **NEVER** allow an action that violates a rule in the EPKB.
-2. **NEVER** use external knowledge or common sense; rely only on the EPKB rule.
-3. **MUST SPECIFY APPLIED RULES**: You MUST explicitly list which rules were applied in your decision.
-4. **PRIORITY**: Security and Compliance override Efficiency. When in doubt, Block.
-5. **OUTPUT FORMAT**: Your final response MUST be a single, valid JSON object.
-
-CORE LOGIC FLOW:
-1. **RECEIVE INTERCEPTION**: Analyze the intercepted action JSON.
-2. **RETRIEVE POLICY**: Apply relevant policy rules for the target_tool.
-3. **REASON & EVALUATE**: Compare tool_arguments and user_context against rules.
-4. **DECIDE**: Determine if action is compliant (ALLOW/BLOCK/FLAG).
-5. **SPECIFY RULES**: List the specific rule IDs that were applied.
-6. **LOG**: Record decision with rationale and severity.
-
-IMPORTANT: If the action is ALLOWED, you must still specify which rules were evaluated (even if none were violated).
-
-POLICY RULES TO APPLY:
-{policy_rules}
-
-OUTPUT JSON FORMAT:
-{{
-  "decision": "ALLOW|BLOCK|FLAG",
-  "rationale": "concise explanation of why this decision was made",
-  "severity": "HIGH|MEDIUM|LOW|null",
-  "applied_rules": ["rule_id_1", "rule_id_2"]  // LIST OF SPECIFIC RULE IDs THAT WERE APPLIED
-}}"""
+        self._policy_version = 0  # Incremented whenever the loaded rule set changes
+        self._policies_digest: Optional[bytes] = None  # Digest of the rows behind the index
+        self._policy_rows: List[Dict[str, Any]] = []  # Rows behind the index, for add_policies
+        self._incremental_patterns = 0  # Patterns appended by add_policies since the last build
+        self._policies_db_version: Optional[str] = None  # DB change marker at the last load
+
+        # Background refresher; requests never wait on a reload once it runs.
+        # Database change notifications request a reload; bursts within the
+        # debounce window share one reload.
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._refresh_requested = asyncio.Event()
+        self._refresh_debounce = 0.2  # seconds
+        self._listen_task: Optional[asyncio.Task] = None
+
+        # Tools known to match no policy, reset whenever policies reload
+        self._no_policy_tools: Set[str] = set()
+        self._no_policy_tools_max_size = 10_000
+
+        # Matched rule entries per tool name, reset whenever policies reload
+        self._tool_matches: Dict[str, List[Dict[str, Any]]] = {}
+        self._tool_matches_max_size = 10_000
+
+        # Formatted policy rules block per rule set, keyed by the rules' content
+        # digests (_rule_set_key), so entries stay valid across policy reloads
+        self._prompt_cache: "OrderedDict[Tuple[str, ...], str]" = OrderedDict()
+        self._prompt_cache_max_size = 1024
+
+        # Decision statistics: total/allow/block/flag counters
+        self._decision_stats = array.array("Q", [0, 0, 0, 0])
+
+        # Master System Prompt with strict applied rules requirement. It is
+        # static so providers can reuse the cached prefix across calls; the
+        # policy rules travel at the start of the user message instead.
+        self.master_prompt = """You are the Ethical Reasoner for OrchestraGuard. Evaluate intercepted agent actions against enterprise policy rules.
+
+Rules:
+- Never allow an action that violates a listed rule.
+- Judge only by the listed rules, not external knowledge.
+- Security and compliance override efficiency; when in doubt, BLOCK.
+- Always list the rule IDs you applied, including for ALLOW.
+
+The user message lists rules under "POLICY RULES TO APPLY", one per line:
+[rule_id] description | when: condition_logic | violation: action_on_violation (severity)
+Compare tool_arguments and user_context against them.
+
+Reply with one JSON object only:
+{"decision": "ALLOW|BLOCK|FLAG", "rationale": "concise reason", "severity": "HIGH|MEDIUM|LOW|null", "applied_rules": ["rule_id", ...]}"""
 
     async def initialize(self) -> None:
         """Initialize engine with dependencies and load policies."""
@@ -92,84 +252,486 @@ OUTPUT JSON FORMAT:
         self.notify_service = NotificationService.get_instance()
 
         # Load active policies on initialization
-        await self._load_active_policies()
+        await self._refresh_policies()
+
+        # Start the LLM batcher, the batched audit log writer, the BLOCK alert
+        # sender and the policy refresher
+        self._llm_batcher = asyncio.create_task(self._run_llm_batcher())
+        self._log_flusher = asyncio.create_task(self._flush_audit_logs())
+        self._alert_sender = asyncio.create_task(self._send_block_alerts())
+        self._refresh_task = asyncio.create_task(self._refresh_loop())
+        self._listen_task = asyncio.create_task(self._listen_policy_changes())
         logger.info("✅ Enhanced ReasoningEngine initialized")
 
-    async def _load_active_policies(self) -> None:
-        """FIXED: Properly load active policies from database."""
+    async def _load_active_policies(self) -> bool:
+        """
+        Load active policies from the database and swap in a new index.
+        If the rows that feed the index are unchanged, the current index and
+        its caches are kept. Returns False if the load failed.
+        """
         try:
             policies = await self.db_service.get_active_policies()
+            logger.info(f"Processing {len(policies)} active policies")
 
-            # Clear cache
-            self._policy_cache.clear()
+            digest = self._policies_digest_of(policies)
+            if digest is not None and digest == self._policies_digest:
+                # Same rules as loaded - keep decision and match caches warm
+                self._policy_rows = policies
+                self._cache_timestamp = datetime.now(timezone.utc)
+                self._cache_monotonic = time.monotonic()
+                logger.info("Active policies unchanged, keeping current cache")
+                return True
 
-            logger.info(f"Processing {len(policies)} active policies")
+            await self._install_policies(policies, digest)
+            return True
 
-            # FIXED: Proper policy parsing
-            for policy in policies:
-                if not policy.get("is_active", False):
-                    continue
+        except Exception as e:
+            logger.error(f"Failed to load active policies: {e}")
+            # Keep existing cache if available
+            return False
 
-                # Extract rule data - the rules are stored as JSONB
-                rules_data = policy.get("rules", {})
+    async def add_policies(self, policies: List[Dict[str, Any]]) -> None:
+        """
+        Merge newly stored policy rows (e.g. from the Policy Architect) into
+        the live index without a database read. New rules are appended in
+        place (see _merge_policy_rows); the whole index is rebuilt only when
+        rows replace loaded ones or too many patterns have been appended.
+        The next refresh still checks the database change marker, so the
+        database remains the source of truth.
+        """
+        if not policies:
+            return
+        try:
+            added_ids = {policy.get("id") for policy in policies}
+            loaded_ids = {row.get("id") for row in self._policy_rows}
+            rows = [row for row in self._policy_rows if row.get("id") not in added_ids]
+            rows.extend(policies)
+            digest = self._policies_digest_of(rows)
+
+            # Replaced rows can't be taken out of the index incrementally
+            if added_ids & loaded_ids or not self._merge_policy_rows(policies):
+                await self._install_policies(rows, digest)
+                return
+
+            self._policy_version += 1
+            self._policies_digest = digest
+            self._policy_rows = rows
+            logger.info(f"Merged {len(policies)} new policies into cache")
+        except Exception as e:
+            logger.error(f"Failed to add policies, requesting a full reload: {e}")
+            self.request_policy_refresh()
 
-                # Handle both direct rule dict and nested structure
-                if isinstance(rules_data, dict):
-                    try:
-                        rule_obj = PolicyRule(
-                            rule_id=rules_data.get("rule_id", f"rule_{policy['id']}"),
-                            description=rules_data.get(
-                                "description", "No description"
-                            ),
-                            target_tool_regex=rules_data.get(
-                                "target_tool_regex", ".*"
-                            ),
-                            condition_logic=rules_data.get("condition_logic", "True"),
-                            severity=rules_data.get("severity", "MEDIUM"),
-                            action_on_violation=rules_data.get(
-                                "action_on_violation", "BLOCK"
-                            ),
-                        )
+    def _merge_policy_rows(self, policies: List[Dict[str, Any]]) -> bool:
+        """
+        Append new policy rows to the live index. Rules for an already
+        indexed pattern join its entry list; new literal-prefix patterns go
+        into the trie and other new patterns are matched individually.
+        Cached tool lookups that a touched pattern matches are evicted;
+        prompt and decision caches are keyed by rule content and stay valid.
+        Returns False, without changing anything, when the appended
+        non-trie patterns would exceed _INCREMENTAL_PATTERN_LIMIT.
+        Runs without awaiting, so requests never see a half-merged index.
+        """
+        policy_cache = list(self._policy_cache)
+        index_by_pattern = {
+            pattern.pattern: idx for idx, (pattern, _) in enumerate(policy_cache)
+        }
+        touched: List[Pattern[str]] = []
+        new_trie: List[Tuple[int, List[str]]] = []
+        new_complex: List[Tuple[int, Pattern[str]]] = []
+
+        for target_regex, entries in self._parse_policy_rows(policies).items():
+            compiled = self._compile_target_regex(target_regex)
+            touched.append(compiled)
+            idx = index_by_pattern.get(compiled.pattern)
+            if idx is not None:
+                pattern, existing = policy_cache[idx]
+                policy_cache[idx] = (pattern, existing + entries)
+                continue
+
+            idx = len(policy_cache)
+            index_by_pattern[compiled.pattern] = idx
+            policy_cache.append((compiled, entries))
+            prefixes = self._trie_prefixes(compiled)
+            if prefixes is None:
+                new_complex.append((idx, compiled))
+            else:
+                new_trie.append((idx, prefixes))
+
+        if self._incremental_patterns + len(new_complex) > _INCREMENTAL_PATTERN_LIMIT:
+            return False
+
+        self._policy_cache = policy_cache
+        for idx, prefixes in new_trie:
+            self._add_to_prefix_trie(self._prefix_trie, idx, prefixes)
+        if new_complex:
+            self._unfused_patterns = self._unfused_patterns + new_complex
+            self._incremental_patterns += len(new_complex)
+
+        self._tool_matches = {
+            tool: entries
+            for tool, entries in self._tool_matches.items()
+            if not any(pattern.match(tool) for pattern in touched)
+        }
+        self._no_policy_tools = {
+            tool for tool in self._no_policy_tools
+            if not any(pattern.match(tool) for pattern in touched)
+        }
+        return True
 
-                        target_regex = rule_obj.target_tool_regex
-                        self._policy_cache[target_regex].append(
+    async def _install_policies(
+        self, policies: List[Dict[str, Any]], digest: Optional[bytes]
+    ) -> None:
+        """Build the index for policy rows and swap it in, resetting dependent caches."""
+        # Build the new index off the event loop for larger policy sets
+        # so requests keep flowing; it is swapped in below in one step
+        if len(policies) > _INLINE_POLICY_BUILD_LIMIT:
+            index = await asyncio.to_thread(self._build_policy_index, policies)
+        else:
+            index = self._build_policy_index(policies)
+        (
+            policy_cache, prefix_trie, pattern_set, pattern_set_indices,
+            combined_re, unfused_patterns,
+        ) = index
+
+        (
+            self._policy_cache,
+            self._prefix_trie,
+            self._pattern_set,
+            self._pattern_set_indices,
+            self._combined_re,
+            self._unfused_patterns,
+            self._decision_cache,
+            self._no_policy_tools,
+            self._tool_matches,
+        ) = (
+            policy_cache, prefix_trie, pattern_set, pattern_set_indices,
+            combined_re, unfused_patterns,
+            OrderedDict(), set(), {},
+        )
+        self._policy_version += 1
+        self._policies_digest = digest
+        self._policy_rows = policies
+        self._incremental_patterns = 0
+        self._cache_timestamp = datetime.now(timezone.utc)
+        self._cache_monotonic = time.monotonic()
+        logger.info(
+            f"Loaded {sum(len(entries) for _, entries in self._policy_cache)} "
+            f"rules into cache"
+        )
+
+    @staticmethod
+    def _policies_digest_of(policies: List[Dict[str, Any]]) -> Optional[bytes]:
+        """
+        Digest of the policy fields the index is built from (None if not
+        serializable). Rows are taken in id order, so rows merged by
+        add_policies digest the same as the database's listing of them.
+        """
+        try:
+            payload = jsonutil.dumps_bytes(
+                [
+                    (p.get("id"), p.get("name"), p.get("is_active"), p.get("rules"))
+                    for p in sorted(policies, key=lambda p: str(p.get("id")))
+                ],
+                sort_keys=True,
+            )
+        except (TypeError, ValueError):
+            return None
+        return hashlib.blake2b(payload, digest_size=16).digest()
+
+    def _build_policy_index(self, policies: List[Dict[str, Any]]) -> Tuple[Any, ...]:
+        """
+        Parse policy rows and build the matching structures without touching
+        engine state, so it can run in a worker thread. Returns (policy_cache,
+        prefix_trie, pattern_set, pattern_set_indices, combined_re, unfused_patterns).
+        """
+        rules_by_regex = self._parse_policy_rows(policies)
+
+        # Compile each pattern once here rather than on every action
+        policy_cache: List[Tuple[Pattern[str], List[Dict[str, Any]]]] = [
+            (self._compile_target_regex(target_regex), entries)
+            for target_regex, entries in rules_by_regex.items()
+        ]
+
+        prefix_trie, complex_patterns = self._build_prefix_trie(policy_cache)
+        pattern_set, pattern_set_indices, complex_patterns = self._build_pattern_set(
+            complex_patterns
+        )
+        combined_re, unfused_patterns = self._build_combined_regex(complex_patterns)
+        return (
+            policy_cache, prefix_trie, pattern_set, pattern_set_indices,
+            combined_re, unfused_patterns,
+        )
+
+    def _parse_policy_rows(
+        self, policies: List[Dict[str, Any]]
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Parse active policy rows into cache entries grouped by target regex."""
+        # Group rules by target regex before compiling
+        rules_by_regex: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+
+        # FIXED: Proper policy parsing
+        for policy in policies:
+            if not policy.get("is_active", False):
+                continue
+
+            # Extract rule data - the rules are stored as JSONB
+            rules_data = policy.get("rules", {})
+
+            # Handle both direct rule dict and nested structure
+            if isinstance(rules_data, dict):
+                try:
+                    rule_obj = _parse_policy_rule(
+                        jsonutil.dumps(
                             {
-                                "policy_id": policy.get("id"),
-                                "policy_name": policy.get("name", "Unnamed Policy"),
-                                "rule": rule_obj,
-                            }
+                                "rule_id": rules_data.get("rule_id", f"rule_{policy['id']}"),
+                                "description": rules_data.get(
+                                    "description", "No description"
+                                ),
+                                "target_tool_regex": rules_data.get(
+                                    "target_tool_regex", ".*"
+                                ),
+                                "condition_logic": rules_data.get("condition_logic", "True"),
+                                "severity": rules_data.get("severity", "MEDIUM"),
+                                "action_on_violation": rules_data.get(
+                                    "action_on_violation", "BLOCK"
+                                ),
+                            },
+                            sort_keys=True,
                         )
+                    )
 
+                    # Conditions outside the safe subset are left to the LLM
+                    try:
+                        condition = compile_condition(
+                            rule_obj.condition_logic, rule_obj.rule_id
+                        )
+                    except UnsafeConditionError as e:
                         logger.debug(
-                            f"Loaded rule: {rule_obj.rule_id} for {target_regex}"
+                            f"Rule {rule_obj.rule_id} needs LLM evaluation: {e}"
                         )
+                        condition = None
+
+                    target_regex = rule_obj.target_tool_regex
+                    prompt_line = self._format_rule_for_prompt(rule_obj)
+                    rules_by_regex[target_regex].append(
+                        {
+                            "policy_id": policy.get("id"),
+                            "policy_name": policy.get("name", "Unnamed Policy"),
+                            "rule": rule_obj,
+                            "condition": condition,
+                            # Lowercased once for matching against LLM rationales
+                            "rationale_terms": (
+                                rule_obj.rule_id.lower(),
+                                rule_obj.description.lower(),
+                            ),
+                            # Rendered once; prompts join these lines
+                            "prompt_line": prompt_line,
+                            # Content digest of what the LLM sees for this rule
+                            "rule_key": hashlib.blake2b(
+                                prompt_line.encode("utf-8"), digest_size=8
+                            ).hexdigest(),
+                        }
+                    )
 
-                    except Exception as e:
-                        logger.warning(
-                            f"Skipping invalid policy {policy.get('id')}: {e}"
-                        )
+                    logger.debug(
+                        f"Loaded rule: {rule_obj.rule_id} for {target_regex}"
+                    )
 
-            self._cache_timestamp = datetime.utcnow()
-            logger.info(
-                f"Loaded {sum(len(rules) for rules in self._policy_cache.values())} "
-                f"rules into cache"
-            )
+                except Exception as e:
+                    logger.warning(
+                        f"Skipping invalid policy {policy.get('id')}: {e}"
+                    )
+
+        return rules_by_regex
+
+    @staticmethod
+    def _compile_target_regex(target_regex: str) -> Pattern[str]:
+        """Compile a rule's target_tool_regex, falling back to a substring match if invalid."""
+        try:
+            return re.compile(target_regex)
+        except re.error as e:
+            logger.warning(f"Invalid regex pattern '{target_regex}': {e}")
+            return re.compile("(?s:.*)" + re.escape(target_regex))
+
+    def _build_prefix_trie(
+        self, policy_cache: List[Tuple[Pattern[str], List[Dict[str, Any]]]]
+    ) -> Tuple[Dict[str, Any], List[Tuple[int, Pattern[str]]]]:
+        """
+        Put literal-prefix patterns (e.g. "slack", "^db\\.write.*") into a
+        character trie; since patterns are applied with match(), these only
+        test that the tool name starts with the literal. A single group of
+        literal alternatives (e.g. "^db\\.(write|delete)") is expanded into
+        one prefix per alternative. Returns the trie and the remaining
+        patterns that still need regex matching.
+        """
+        trie: Dict[str, Any] = {}
+        complex_patterns: List[Tuple[int, Pattern[str]]] = []
+
+        for idx, (pattern, _) in enumerate(policy_cache):
+            prefixes = self._trie_prefixes(pattern)
+            if prefixes is None:
+                complex_patterns.append((idx, pattern))
+            else:
+                self._add_to_prefix_trie(trie, idx, prefixes)
+
+        return trie, complex_patterns
+
+    @staticmethod
+    def _trie_prefixes(pattern: Pattern[str]) -> Optional[List[str]]:
+        """Literal prefixes a pattern reduces to, or None if it needs regex matching."""
+        literal = _LITERAL_PREFIX_RE.match(pattern.pattern)
+        if literal is not None:
+            return [literal.group(1)]
+        alternation = _LITERAL_ALTERNATION_RE.match(pattern.pattern)
+        if alternation is None:
+            return None
+        head, alternatives, tail = alternation.groups()
+        return [head + alternative + tail for alternative in alternatives.split("|")]
+
+    @staticmethod
+    def _add_to_prefix_trie(trie: Dict[str, Any], idx: int, prefixes: List[str]) -> None:
+        """Record policy_cache index idx at the trie node of each literal prefix."""
+        for prefix in prefixes:
+            node = trie
+            for char in prefix.replace("\\.", "."):
+                node = node.setdefault(char, {})
+            indices = node.setdefault("", [])
+            if idx not in indices:
+                indices.append(idx)
+
+    def _build_pattern_set(
+        self, patterns: List[Tuple[int, Pattern[str]]]
+    ) -> Tuple[Optional[Any], List[int], List[Tuple[int, Pattern[str]]]]:
+        """
+        Compile patterns into one start-anchored RE2 set (the same semantics
+        as match()), which runs in linear time so a pathological policy
+        regex can't stall the engine. Patterns RE2 rejects (backreferences,
+        lookarounds) are returned for the Python re path.
+        """
+        if not RE2_AVAILABLE or not patterns:
+            return None, [], patterns
+
+        options = re2.Options()
+        options.log_errors = False
+        pattern_set = re2.Set.MatchSet(options)
+        indices: List[int] = []
+        remaining: List[Tuple[int, Pattern[str]]] = []
+
+        for idx, pattern in patterns:
+            try:
+                pattern_set.Add(pattern.pattern)
+                indices.append(idx)
+            except re2.error:
+                remaining.append((idx, pattern))
+
+        if not indices:
+            return None, [], remaining
+
+        try:
+            pattern_set.Compile()
+        except re2.error as e:
+            logger.warning(f"Could not build RE2 policy set, using Python re: {e}")
+            return None, [], patterns
+
+        return pattern_set, indices, remaining
 
+    def _build_combined_regex(
+        self, patterns: List[Tuple[int, Pattern[str]]]
+    ) -> Tuple[Optional[Pattern[str]], List[Tuple[int, Pattern[str]]]]:
+        """
+        Fuse cached patterns into one regex so a single match finds every
+        applicable entry. Each pattern sits in its own optional lookahead at
+        the start of the string, so all of them are tried, not just the
+        first alternative that matches.
+        """
+        fused: List[str] = []
+        unfused: List[Tuple[int, Pattern[str]]] = []
+
+        for idx, pattern in patterns:
+            if pattern.groupindex or _UNFUSABLE_RE.search(pattern.pattern):
+                unfused.append((idx, pattern))
+            else:
+                fused.append(f"(?:(?=(?P<p{idx}>{pattern.pattern}))|)")
+
+        if not fused:
+            return None, unfused
+
+        try:
+            return re.compile("".join(fused)), unfused
+        except re.error as e:
+            logger.warning(f"Could not build combined policy regex, matching individually: {e}")
+            return None, list(patterns)
+
+    async def _refresh_loop(self) -> None:
+        """Reload policies every ttl/2 seconds, or sooner when a refresh is requested."""
+        while True:
+            try:
+                await asyncio.wait_for(
+                    self._refresh_requested.wait(), timeout=self._cache_ttl / 2
+                )
+            except asyncio.TimeoutError:
+                pass
+            else:
+                # Let a burst of change notifications settle into one reload
+                await asyncio.sleep(self._refresh_debounce)
+            self._refresh_requested.clear()
+            # _load_active_policies logs failures and keeps the current cache
+            await self._refresh_policies()
+
+    async def _refresh_policies(self) -> None:
+        """Reload policies only when the database change marker moved since the last load."""
+        try:
+            db_version = await self.db_service.get_policies_version()
         except Exception as e:
-            logger.error(f"Failed to load active policies: {e}")
-            # Keep existing cache if available
+            logger.warning(f"Could not read policies version, reloading: {e}")
+            db_version = None
+
+        if db_version is not None and db_version == self._policies_db_version:
+            # Unchanged - the current cache counts as fresh
+            self._cache_timestamp = datetime.now(timezone.utc)
+            self._cache_monotonic = time.monotonic()
+            return
+
+        if await self._load_active_policies():
+            self._policies_db_version = db_version
+
+    async def _listen_policy_changes(self) -> None:
+        """Request a reload on each database policy change notification, reconnecting on failure."""
+        while True:
+            try:
+                await self.db_service.listen_policy_changes(self.request_policy_refresh)
+            except RuntimeError as e:
+                # Not configured - periodic refresh alone keeps policies current
+                logger.info(f"Policy change notifications disabled: {e}")
+                return
+            except Exception as e:
+                logger.warning(f"Policy change listener failed, reconnecting: {e}")
+            # Changes may have been missed while disconnected
+            self.request_policy_refresh()
+            await asyncio.sleep(self._cache_ttl / 2)
+
+    def request_policy_refresh(self) -> None:
+        """Ask the background refresher to reload policies now (e.g. after new policies are stored)."""
+        self._refresh_requested.set()
 
     async def _ensure_fresh_policies(self) -> None:
-        """Ensure policy cache is fresh (within TTL)."""
+        """Ensure policy cache is fresh (within TTL) when no background refresher is running."""
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
         if (
-            self._cache_timestamp is None
-            or (datetime.utcnow() - self._cache_timestamp).seconds > self._cache_ttl
+            self._cache_monotonic is None
+            or time.monotonic() - self._cache_monotonic > self._cache_ttl
         ):
-            await self._load_active_policies()
+            await self._refresh_policies()
 
     async def process_action(self, action: InterceptedAction) -> Decision:
-        """Process intercepted action with complete logic."""
-        start_time = datetime.utcnow()
+        """
+        Process intercepted action with complete logic. Only the fixed
+        no-policy ALLOW skips validation (model_construct); decisions built
+        from rule rows, LLM output or errors are validated.
+        """
+        started = time.monotonic_ns()
 
         try:
             # 1. Ensure we have fresh policies
@@ -180,7 +742,7 @@ OUTPUT JSON FORMAT:
 
             if not relevant_rules:
                 # No policies exist for this tool - default to ALLOW with logging
-                decision = Decision(
+                decision = Decision.model_construct(
                     action_id=action.action_id,
                     source_agent=action.source_agent,
                     target_tool=action.target_tool,
@@ -188,57 +750,54 @@ OUTPUT JSON FORMAT:
                     rationale="No active policies defined for this tool",
                     severity=None,
                     applied_rules=[],
-                    timestamp=datetime.utcnow(),
+                    timestamp=datetime.now(timezone.utc),
                 )
-                await self._log_decision(decision, action)
+                self._log_decision_in_background(decision, action, started)
                 self._update_stats(decision)
                 return decision
 
-            # 3. Construct dynamic prompt with injected rules
-            policy_text = self._format_policies_for_prompt(relevant_rules)
-            full_prompt = self.master_prompt.format(policy_rules=policy_text)
-
-            # 4. Prepare action context for LLM
-            action_context = {
-                "action_id": action.action_id,
-                "source_agent": action.source_agent,
-                "target_tool": action.target_tool,
-                "tool_arguments": action.tool_arguments,
-                "user_context": action.user_context or {},
-                "timestamp": action.timestamp.isoformat()
-                if action.timestamp
-                else datetime.utcnow().isoformat(),
-            }
-
-            user_prompt = (
-                "Evaluate this intercepted action against the provided policies:\n\n"
-                "```json\n"
-                f"{json.dumps(action_context, indent=2)}\n"
-                "```\n"
-                "Provide your decision in the required JSON format."
-            )
-
-            # 5. Call LLM with retry logic
-            llm_response = await self._call_llm_with_retry(
-                prompt=user_prompt, system_prompt=full_prompt
+            # 3. Evaluate conditions locally; only undecidable rules go to the LLM
+            fired_rules, llm_rules = self._evaluate_conditions_locally(
+                action, relevant_rules
             )
+            blocking = [
+                entry for entry in fired_rules
+                if entry["rule"].action_on_violation == ActionOnViolationEnum.BLOCK
+            ]
+
+            if blocking or (fired_rules and not llm_rules):
+                decision_data = self._decision_from_fired_rules(
+                    action, blocking or fired_rules
+                )
+            elif not llm_rules:
+                decision_data = Decision(
+                    action_id=action.action_id,
+                    source_agent=action.source_agent,
+                    target_tool=action.target_tool,
+                    decision=DecisionEnum.ALLOW,
+                    rationale="No policy conditions matched this action",
+                    severity=None,
+                    applied_rules=[entry["rule"].rule_id for entry in relevant_rules],
+                    timestamp=datetime.now(timezone.utc),
+                )
+            else:
+                # 4-6. Ask the LLM about the remaining rules
+                decision_data = await self._decide_with_llm_coalesced(action, llm_rules)
 
-            # 6. Parse LLM response
-            decision_data = self._parse_llm_response(
-                llm_response, action, relevant_rules
-            )
+                # A locally fired FLAG still applies if the LLM allows the rest
+                if fired_rules and decision_data.decision == DecisionEnum.ALLOW:
+                    decision_data = self._decision_from_fired_rules(action, fired_rules)
 
-            # 7. Immediate notification for BLOCK decisions
+            # 7-8. Notify (BLOCK only) and log in the background; neither gates the response
             if decision_data.decision == DecisionEnum.BLOCK:
-                await self._immediate_block_notification(decision_data, action)
-
-            # 8. Log decision
-            await self._log_decision(decision_data, action)
+                self._notify_and_log_block(decision_data, action, started)
+            else:
+                self._log_decision_in_background(decision_data, action, started)
 
             # 9. Update statistics
             self._update_stats(decision_data)
 
-            processing_time = (datetime.utcnow() - start_time).total_seconds()
+            processing_time = (time.monotonic_ns() - started) / 1e9
             logger.info(
                 f"Action {action.action_id} processed in {processing_time:.2f}s: "
                 f"{decision_data.decision}"
@@ -254,46 +813,443 @@ OUTPUT JSON FORMAT:
                 source_agent=action.source_agent,
                 target_tool=action.target_tool,
                 decision=DecisionEnum.BLOCK,
-                rationale=f"System error in policy evaluation: {str(e)}",
+                rationale=f"System error in policy evaluation: {str(e)}"[:1000],
                 severity=SeverityEnum.HIGH,
                 applied_rules=["SYSTEM-ERROR"],
-                timestamp=datetime.utcnow(),
+                timestamp=datetime.now(timezone.utc),
             )
 
             # Notify about system error
-            await self._immediate_block_notification(emergency_decision, action)
-            await self._log_decision(emergency_decision, action)
+            self._notify_and_log_block(emergency_decision, action, started)
 
             return emergency_decision
 
+    async def process_actions(self, actions: List[InterceptedAction]) -> List[Any]:
+        """
+        Process a list of actions concurrently; provider calls stay capped by
+        the LLM concurrency limit. Returns decisions in input order, with an
+        exception in place of any action that raised.
+        """
+        return await asyncio.gather(
+            *(self.process_action(action) for action in actions), return_exceptions=True
+        )
+
+    def _evaluate_conditions_locally(
+        self, action: InterceptedAction, relevant_rules: List[Dict[str, Any]]
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Evaluate compiled rule conditions in-process.
+
+        Returns:
+            (rules whose condition fired, rules that need the LLM)
+        """
+        fired: List[Dict[str, Any]] = []
+        undecided: List[Dict[str, Any]] = []
+        scope = build_condition_scope(action.tool_arguments, action.user_context)
+
+        for entry in relevant_rules:
+            condition = entry.get("condition")
+            if condition is None:
+                undecided.append(entry)
+                continue
+            try:
+                if evaluate_condition(condition, scope):
+                    fired.append(entry)
+            except Exception as e:
+                # e.g. comparing mismatched types; let the LLM judge this rule
+                logger.debug(f"Local evaluation of {entry['rule'].rule_id} failed: {e}")
+                undecided.append(entry)
+
+        return fired, undecided
+
+    def _decision_from_fired_rules(
+        self, action: InterceptedAction, fired_rules: List[Dict[str, Any]]
+    ) -> Decision:
+        """Build a decision directly from rules whose conditions fired."""
+        rules = [entry["rule"] for entry in fired_rules]
+        blocked = any(rule.action_on_violation == ActionOnViolationEnum.BLOCK for rule in rules)
+        severity = max((rule.severity for rule in rules), key=_SEVERITY_RANK.get)
+        rationale = (
+            f"Policy condition matched for {', '.join(rule.rule_id for rule in rules)}: "
+            f"{'; '.join(rule.description for rule in rules)}"
+        )
+
+        return Decision(
+            action_id=action.action_id,
+            source_agent=action.source_agent,
+            target_tool=action.target_tool,
+            decision=DecisionEnum.BLOCK if blocked else DecisionEnum.FLAG,
+            rationale=rationale[:1000],
+            severity=severity,
+            applied_rules=[rule.rule_id for rule in rules],
+            timestamp=datetime.now(timezone.utc),
+        )
+
+    async def _decide_with_llm_coalesced(
+        self, action: InterceptedAction, relevant_rules: List[Dict[str, Any]]
+    ) -> Decision:
+        """
+        Share one LLM decision between identical actions: a recent result is
+        reused for a short TTL, and concurrent duplicates await the call
+        already in flight. Notification and logging stay per action.
+        """
+        try:
+            # Raw 16-byte digest of the canonical JSON bytes, used directly as the key
+            key = hashlib.blake2b(
+                jsonutil.dumps_bytes(
+                    [
+                        self._rule_set_key(relevant_rules), action.target_tool,
+                        action.source_agent,
+                        action.tool_arguments, action.user_context,
+                    ],
+                    sort_keys=True,
+                ),
+                digest_size=16,
+            ).digest()
+        except (TypeError, ValueError):
+            return await self._decide_with_llm(action, relevant_rules)
+
+        cached = self._decision_cache.get(key)
+        if cached is not None and time.monotonic() - cached[0] < self._decision_cache_ttl:
+            self._decision_cache.move_to_end(key)
+            return self._restamp_decision(cached[1], action)
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._decide_with_llm(action, relevant_rules))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._on_llm_decision_done(key, done))
+
+        # Shield so one caller being cancelled doesn't cancel the shared call
+        decision = await asyncio.shield(task)
+        return self._restamp_decision(decision, action)
+
+    def _on_llm_decision_done(self, key: bytes, task: asyncio.Task) -> None:
+        """Retire an in-flight LLM decision and cache successful results."""
+        self._inflight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+
+        decision = task.result()
+        if "SYSTEM-ERROR" in decision.applied_rules:
+            return
+        if not self._cache_violations and decision.decision != DecisionEnum.ALLOW:
+            return
+
+        self._decision_cache[key] = (time.monotonic(), decision)
+        while len(self._decision_cache) > self._decision_cache_max_size:
+            self._decision_cache.popitem(last=False)
+
+    def _restamp_decision(self, decision: Decision, action: InterceptedAction) -> Decision:
+        """Reuse a shared decision for another action."""
+        if decision.action_id == action.action_id:
+            return decision
+        return decision.model_copy(
+            update={
+                "action_id": action.action_id,
+                "source_agent": action.source_agent,
+                "timestamp": datetime.now(timezone.utc),
+            }
+        )
+
+    async def _decide_with_llm(
+        self, action: InterceptedAction, relevant_rules: List[Dict[str, Any]]
+    ) -> Decision:
+        """Ask the LLM for a decision on the given rules, through the batcher when it runs."""
+        if self._llm_batcher is None or self._llm_batcher.done():
+            return await self._decide_with_llm_single(action, relevant_rules)
+
+        future = asyncio.get_running_loop().create_future()
+        self._llm_batch_queue.put_nowait((action, relevant_rules, future))
+        return await future
+
+    async def _run_llm_batcher(self) -> None:
+        """Background batcher: gather queued LLM evaluations for a short window, then dispatch them together."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._llm_batch_queue.get()]
+            deadline = loop.time() + self._llm_batch_window
+            while len(batch) < self._llm_batch_max_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(
+                        await asyncio.wait_for(self._llm_batch_queue.get(), timeout=remaining)
+                    )
+                except asyncio.TimeoutError:
+                    break
+
+            # Dispatch each bin without blocking the next window
+            for items in self._bin_llm_batch(batch):
+                task = asyncio.create_task(self._dispatch_llm_batch(items))
+                self._llm_batch_tasks.add(task)
+                task.add_done_callback(self._llm_batch_tasks.discard)
+
+    def _bin_llm_batch(
+        self, batch: List[Tuple[InterceptedAction, List[Dict[str, Any]], asyncio.Future]]
+    ) -> List[List[Tuple[InterceptedAction, List[Dict[str, Any]], asyncio.Future]]]:
+        """
+        Split a gathered batch into bins of actions that share the same rule
+        set and size class, so each call carries only that rules block,
+        repeats a cacheable prompt prefix, and small actions don't wait on
+        one huge one. Actions alone in their bin are sent together in one
+        mixed batch per size class.
+        """
+        bins: Dict[
+            Tuple[int, Tuple[str, ...]],
+            List[Tuple[InterceptedAction, List[Dict[str, Any]], asyncio.Future]],
+        ] = {}
+        for item in batch:
+            key = (self._action_size_class(item[0]), self._rule_set_key(item[1]))
+            bins.setdefault(key, []).append(item)
+
+        grouped = [items for items in bins.values() if len(items) > 1]
+        mixed: Dict[int, List[Tuple[InterceptedAction, List[Dict[str, Any]], asyncio.Future]]] = {}
+        for (size_class, _), items in bins.items():
+            if len(items) == 1:
+                mixed.setdefault(size_class, []).extend(items)
+        grouped.extend(mixed.values())
+        return grouped
+
+    @staticmethod
+    def _action_size_class(action: InterceptedAction) -> int:
+        """Rough prompt size class of an action: 0 small, 1 medium, 2 large."""
+        size = len(jsonutil.dumps_bytes(action.tool_arguments))
+        if action.user_context:
+            size += len(jsonutil.dumps_bytes(action.user_context))
+        return min(size // _LLM_BATCH_SIZE_BIN, 2)
+
+    async def _dispatch_llm_batch(
+        self, batch: List[Tuple[InterceptedAction, List[Dict[str, Any]], asyncio.Future]]
+    ) -> None:
+        """Resolve each queued future from one batched LLM call (or a single call for a batch of one)."""
+        # Callers that went away no longer need a decision
+        batch = [item for item in batch if not item[2].done()]
+
+        # Results are matched by action_id; repeated ids are evaluated on their own
+        batched: Dict[str, Tuple[InterceptedAction, List[Dict[str, Any]], asyncio.Future]] = {}
+        singles = []
+        for item in batch:
+            if item[0].action_id in batched:
+                singles.append(item)
+            else:
+                batched[item[0].action_id] = item
+        if len(batched) == 1:
+            singles.extend(batched.values())
+            batched = {}
+
+        if batched:
+            try:
+                results = await self._decide_batch_with_llm(list(batched.values()))
+            except Exception as e:
+                logger.error(f"Batched LLM call for {len(batched)} actions failed: {e}")
+                results = {}
+                for _, _, future in batched.values():
+                    if not future.done():
+                        future.set_exception(e)
+
+            for action_id, (action, relevant_rules, future) in batched.items():
+                if future.done():
+                    continue
+                decision_data = results.get(action_id)
+                if decision_data is None:
+                    # Missing from the batched reply - ask about this action alone
+                    logger.warning(f"No batched LLM result for action {action_id}")
+                    singles.append((action, relevant_rules, future))
+                else:
+                    future.set_result(
+                        self._decision_from_llm_data(decision_data, action, relevant_rules)
+                    )
+
+        async def resolve_single(action, relevant_rules, future) -> None:
+            try:
+                decision = await self._decide_with_llm_single(action, relevant_rules)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(decision)
+
+        if singles:
+            await asyncio.gather(*(resolve_single(*item) for item in singles))
+
+    async def _decide_batch_with_llm(
+        self, batch: List[Tuple[InterceptedAction, List[Dict[str, Any]], asyncio.Future]]
+    ) -> Dict[str, Dict[str, Any]]:
+        """Ask the LLM about several actions in one call; returns decision data by action_id."""
+        # One rules block covering every action; each action lists its own rule ids
+        rules = list(
+            {entry["rule_key"]: entry for _, entries, _ in batch for entry in entries}.values()
+        )
+        policy_prompt = self._get_policy_prompt(self._rule_set_key(rules), rules)
+
+        actions_context = []
+        for action, relevant_rules, _ in batch:
+            action_context = self._build_action_context(action)
+            action_context["rule_ids"] = [entry["rule"].rule_id for entry in relevant_rules]
+            actions_context.append(action_context)
+
+        user_prompt = "".join(
+            (policy_prompt, _BATCH_PROMPT_PRE, jsonutil.dumps(actions_context), _BATCH_PROMPT_POST)
+        )
+
+        llm_response = await self._call_llm_with_retry(
+            prompt=user_prompt,
+            system_prompt=self.master_prompt,
+            response_schema=LLMBatchDecisionOutput,
+            json_openers="{[",
+        )
+
+        content = llm_response.content.strip()
+        try:
+            results = LLMBatchDecisionOutput.model_validate_json(content).model_dump(mode="json")["results"]
+        except ValidationError:
+            # Provider without structured output - accept {"results": [...]}
+            # or a bare top-level array of decisions
+            json_content = jsonutil.extract_object(content, openers="{[")
+            if not json_content:
+                raise ValueError("No JSON found in batched LLM response")
+            results = jsonutil.loads(json_content)
+            if isinstance(results, dict):
+                results = results.get("results")
+            if not isinstance(results, list):
+                raise ValueError("Batched LLM response has no results list")
+
+        return {
+            str(item["action_id"]): item
+            for item in results
+            if isinstance(item, dict) and "action_id" in item
+        }
+
+    def _build_action_context(self, action: InterceptedAction) -> Dict[str, Any]:
+        """
+        Action fields the LLM evaluates. Fields that repeat across calls come
+        first and per-call ids last, so the serialized prompt keeps the longest
+        shared prefix for provider-side prefix caching.
+        """
+        return {
+            "target_tool": action.target_tool,
+            "source_agent": action.source_agent,
+            "tool_arguments": action.tool_arguments,
+            "user_context": action.user_context or {},
+            "action_id": action.action_id,
+            "timestamp": action.timestamp.isoformat()
+            if action.timestamp
+            else datetime.now(timezone.utc).isoformat(),
+        }
+
+    async def _decide_with_llm_single(
+        self, action: InterceptedAction, relevant_rules: List[Dict[str, Any]]
+    ) -> Decision:
+        """Ask the LLM for a decision on one action."""
+        # Construct the rules block (cached per rule set)
+        policy_prompt = self._get_policy_prompt(
+            self._rule_set_key(relevant_rules), relevant_rules
+        )
+
+        # Prepare action context for LLM
+        action_context = self._build_action_context(action)
+
+        user_prompt = "".join(
+            (policy_prompt, _USER_PROMPT_PRE, jsonutil.dumps(action_context), _USER_PROMPT_POST)
+        )
+
+        # Call LLM with retry logic
+        llm_response = await self._call_llm_with_retry(
+            prompt=user_prompt, system_prompt=self.master_prompt
+        )
+
+        # Parse LLM response
+        return self._parse_llm_response(llm_response, action, relevant_rules)
+
+    @staticmethod
+    def _rule_set_key(rules: List[Dict[str, Any]]) -> Tuple[str, ...]:
+        """Stable key for a list of rule entries: their content digests, in order."""
+        return tuple(entry["rule_key"] for entry in rules)
+
+    def _get_policy_prompt(
+        self, cache_key: Tuple[str, ...], relevant_rules: List[Dict[str, Any]]
+    ) -> str:
+        """Return the policy rules block for a set of rules (cache_key from _rule_set_key), formatting it once."""
+        policy_prompt = self._prompt_cache.get(cache_key)
+        if policy_prompt is not None:
+            self._prompt_cache.move_to_end(cache_key)
+            return policy_prompt
+
+        policy_text = self._format_policies_for_prompt(relevant_rules)
+        policy_prompt = f"POLICY RULES TO APPLY:\n{policy_text}"
+
+        # Cache the block, evicting the least recently used rule sets
+        self._prompt_cache[cache_key] = policy_prompt
+        while len(self._prompt_cache) > self._prompt_cache_max_size:
+            self._prompt_cache.popitem(last=False)
+
+        return policy_prompt
+
     async def _call_llm_with_retry(
         self,
         prompt: str,
         system_prompt: str,
-        max_retries: int = 3,
+        max_retries: Optional[int] = None,
         base_delay: float = 1.0,
+        max_delay: float = 30.0,
+        response_schema: Type[BaseModel] = LLMDecisionOutput,
+        json_openers: str = "{",
     ) -> LLMResponse:
-        """FIXED: Complete LLM retry logic with exponential backoff."""
+        """
+        LLM retry logic with a per-attempt timeout. Timeouts and transient
+        errors are retried after a short jittered delay; rate-limit errors
+        back off exponentially with jitter (at least half the step, capped at
+        max_delay). While the circuit breaker is open, calls fail immediately
+        with ProviderUnavailableError. json_openers are the brackets that can
+        start the expected reply ("{[" when a bare array is acceptable).
+        """
+        if max_retries is None:
+            max_retries = self._llm_max_retries
         last_error = None
 
         for attempt in range(max_retries):
+            if not self._llm_breaker.allow_request():
+                raise ProviderUnavailableError(
+                    "LLM provider circuit breaker is open after repeated failures"
+                )
+
+            wait = self._cooldown_until - time.monotonic()
+            if wait > 0:
+                # A little jitter so waiters don't all fire at the deadline together
+                await asyncio.sleep(wait + random.uniform(0, 0.1 * wait))
+
             try:
                 logger.debug(f"LLM call attempt {attempt + 1}/{max_retries}")
-                response = await self.llm_provider.invoke(
-                    prompt=prompt,
-                    system_prompt=system_prompt,
-                    temperature=0.1,  # Low temperature for consistent decisions
-                )
+                try:
+                    async with self._llm_slots:
+                        response = await asyncio.wait_for(
+                            self._read_llm_stream(
+                                json_openers,
+                                prompt=prompt,
+                                system_prompt=system_prompt,
+                                temperature=0.1,  # Low temperature for consistent decisions
+                                cache_control={"type": "ephemeral"},  # Static system prompt
+                                response_schema=response_schema,
+                            ),
+                            timeout=self._llm_timeout,
+                        )
+                except asyncio.TimeoutError:
+                    raise TimeoutError(f"LLM call timed out after {self._llm_timeout:.1f}s")
 
                 # Validate response has content
                 if not response.content:
                     raise ValueError("LLM returned empty response")
 
+                self._llm_breaker.record_success()
                 logger.debug(f"LLM call successful on attempt {attempt + 1}")
                 return response
 
             except Exception as e:
                 last_error = e
+                self._llm_breaker.record_failure()
                 logger.warning(f"LLM call failed (attempt {attempt + 1}): {e}")
 
                 if attempt == max_retries - 1:
@@ -302,14 +1258,85 @@ OUTPUT JSON FORMAT:
                         f"LLM call failed after {max_retries} attempts: {str(e)}"
                     )
 
-                # Exponential backoff
-                delay = base_delay * (2**attempt)
+                if self._is_rate_limited(e):
+                    retry_after = self._retry_after(e)
+                    if retry_after is not None:
+                        delay = min(retry_after, max_delay)
+                    else:
+                        # Exponential backoff with jitter, so concurrent callers
+                        # don't retry in lockstep; half the step is a floor so a
+                        # rate-limited provider gets real breathing room
+                        step = min(base_delay * (2**attempt), max_delay)
+                        delay = step / 2 + random.uniform(0, step / 2)
+                    # The cooldown gate at the top of the loop does the waiting,
+                    # for this call and every other one in flight
+                    self._cooldown_until = max(self._cooldown_until, time.monotonic() + delay)
+                    logger.info(f"LLM rate limited; cooling down for {delay:.1f} seconds...")
+                    continue
+                else:
+                    # The previous request was most likely lost; retry almost immediately
+                    delay = random.uniform(0.1, 0.3)
                 logger.info(f"Retrying LLM call in {delay:.1f} seconds...")
                 await asyncio.sleep(delay)
 
         # This should never be reached due to raise above
         raise Exception(f"LLM call failed: {str(last_error)}")
 
+    async def _read_llm_stream(self, json_openers: str = "{", **kwargs: Any) -> LLMResponse:
+        """
+        Stream the LLM reply and stop reading once the first JSON value
+        starting with one of json_openers is complete, skipping any trailing
+        tokens the model would still send. If that value doesn't parse (e.g.
+        braces in leading prose), the rest of the reply is read as usual.
+        Single decisions pass "{" only, so a bracketed list in leading prose
+        can't end the stream; batched replies also accept a bare array.
+        """
+        scanner: Optional[jsonutil.ObjectScanner] = jsonutil.ObjectScanner(openers=json_openers)
+        parts: List[str] = []
+        stream = self.llm_provider.invoke_stream(**kwargs)
+        try:
+            async for chunk in stream:
+                parts.append(chunk)
+                if scanner is None or not scanner.feed(chunk):
+                    continue
+
+                content = "".join(parts)[scanner.start:scanner.end]
+                try:
+                    jsonutil.loads(content)
+                except jsonutil.JSONDecodeError:
+                    scanner = None
+                    continue
+                return LLMResponse(content=content, finish_reason="stop")
+        finally:
+            await stream.aclose()
+
+        return LLMResponse(content="".join(parts))
+
+    @staticmethod
+    def _is_rate_limited(error: Exception) -> bool:
+        """Check whether an LLM error is a rate limit (providers wrap the original error)."""
+        message = str(error).lower()
+        return "rate limit" in message or "429" in message
+
+    @staticmethod
+    def _retry_after(error: Exception) -> Optional[float]:
+        """
+        Read Retry-After (in seconds) from the provider's HTTP response.
+        Providers re-raise their client errors, so the chained errors are searched too.
+        """
+        seen = set()
+        current: Optional[BaseException] = error
+        while current is not None and id(current) not in seen:
+            seen.add(id(current))
+            headers = getattr(getattr(current, "response", None), "headers", None)
+            if headers is not None and headers.get("retry-after") is not None:
+                try:
+                    return max(float(headers.get("retry-after")), 0.0)
+                except ValueError:
+                    return None  # HTTP-date form; fall back to backoff
+            current = current.__cause__ or current.__context__
+        return None
+
     def _parse_llm_response(
         self,
         llm_response: LLMResponse,
@@ -322,17 +1349,38 @@ OUTPUT JSON FORMAT:
         try:
             content = llm_response.content.strip()
 
-            # Try to extract JSON using improved heuristics
-            json_content = self._extract_json_from_response(content)
+            try:
+                # Structured output: the provider constrained the reply to the schema
+                decision_data = LLMDecisionOutput.model_validate_json(content).model_dump(mode="json")
+            except ValidationError:
+                # Provider without structured output - extract JSON using heuristics
+                json_content = self._extract_json_from_response(content)
 
-            if not json_content:
-                logger.error(f"Could not extract JSON from LLM response: {content[:200]}...")
-                raise ValueError("No JSON found in LLM response")
+                if not json_content:
+                    logger.error(f"Could not extract JSON from LLM response: {content[:200]}...")
+                    raise ValueError("No JSON found in LLM response")
+
+                decision_data = jsonutil.loads(json_content)
 
-            decision_data = json.loads(json_content)
+            return self._decision_from_llm_data(decision_data, action, relevant_rules)
+
+        except jsonutil.JSONDecodeError as e:
+            logger.error(f"JSON decode error: {e}")
+            return self._create_error_decision(action, f"JSON parsing error: {str(e)}")
+        except ValueError as e:
+            logger.error(f"LLM output validation failed: {e}")
+            return self._create_error_decision(action, f"LLM output validation failed: {str(e)}")
 
+    def _decision_from_llm_data(
+        self,
+        decision_data: Dict[str, Any],
+        action: InterceptedAction,
+        relevant_rules: List[Dict],
+    ) -> Decision:
+        """Build a Decision from one parsed LLM decision object."""
+        try:
             # Validate decision format
-            if not self._validate_decision_format(decision_data):
+            if not isinstance(decision_data, dict) or not self._validate_decision_format(decision_data):
                 raise ValueError("Invalid decision format from LLM")
 
             # FIXED: Improved applied rules logic
@@ -354,97 +1402,22 @@ OUTPUT JSON FORMAT:
                 rationale=decision_data["rationale"][:1000],
                 severity=severity,
                 applied_rules=applied_rules,
-                timestamp=datetime.utcnow()
+                timestamp=datetime.now(timezone.utc)
             )
 
             return decision
 
-        except json.JSONDecodeError as e:
-            logger.error(f"JSON decode error: {e}")
-            return self._create_error_decision(action, f"JSON parsing error: {str(e)}")
         except (KeyError, ValueError) as e:
             logger.error(f"LLM output validation failed: {e}")
             return self._create_error_decision(action, f"LLM output validation failed: {str(e)}")
 
     def _extract_json_from_response(self, content: str) -> Optional[str]:
         """
-        FIXED: Improved JSON extraction with multiple strategies
-        """
-        strategies = [
-            # Strategy 1: Look for complete JSON object
-            lambda: self._extract_complete_json(content),
-            # Strategy 2: Look for JSON between markers
-            lambda: self._extract_json_between_markers(content, "```json", "```"),
-            lambda: self._extract_json_between_markers(content, "```", "```"),
-            # Strategy 3: Look for JSON after key phrases
-            lambda: self._extract_json_after_phrase(content, "Output:"),
-            lambda: self._extract_json_after_phrase(content, "Decision:"),
-            # Strategy 4: Try to find any JSON-like structure
-            lambda: self._find_json_like_structure(content)
-        ]
-
-        for strategy in strategies:
-            result = strategy()
-            if result:
-                logger.debug(f"Successfully extracted JSON using strategy: {strategy.__name__}")
-                return result
-
-        return None
-
-    def _extract_complete_json(self, content: str) -> Optional[str]:
-        """Extract a complete JSON object from content"""
-        # Look for JSON object at the beginning
-        if content.startswith('{'):
-            # Find matching closing brace
-            stack = []
-            for i, char in enumerate(content):
-                if char == '{':
-                    stack.append('{')
-                elif char == '}':
-                    if stack:
-                        stack.pop()
-                        if not stack:
-                            return content[:i+1]
-        return None
-
-    def _extract_json_between_markers(self, content: str, start_marker: str, end_marker: str) -> Optional[str]:
-        """Extract JSON between markers"""
-        start_idx = content.find(start_marker)
-        if start_idx == -1:
-            return None
-
-        start_idx += len(start_marker)
-        end_idx = content.find(end_marker, start_idx)
-
-        if end_idx == -1:
-            return None
-
-        return content[start_idx:end_idx].strip()
-
-    def _extract_json_after_phrase(self, content: str, phrase: str) -> Optional[str]:
-        """Extract JSON after a specific phrase"""
-        phrase_idx = content.find(phrase)
-        if phrase_idx == -1:
-            return None
-
-        # Look for JSON after the phrase
-        substr = content[phrase_idx + len(phrase):]
-        return self._extract_complete_json(substr.strip())
-
-    def _find_json_like_structure(self, content: str) -> Optional[str]:
-        """Find JSON-like structure using regex"""
-        # Look for something that looks like a JSON object
-        pattern = r'\{[^{}]*\{[^{}]*\}[^{}]*\}|\{[^{}]*\}'
-        matches = re.findall(pattern, content, re.DOTALL)
-
-        for match in matches:
-            try:
-                json.loads(match)
-                return match
-            except json.JSONDecodeError:
-                continue
-
-        return None
+        Extract the first balanced JSON object from the reply in one linear
+        scan, after dropping markdown code fences.
+        """
+        content = content.replace("```json", "").replace("```", "")
+        return jsonutil.extract_object(content)
 
     def _determine_applied_rules(
         self,
@@ -454,13 +1427,15 @@ OUTPUT JSON FORMAT:
         """
         FIXED: Intelligent applied rules determination
         """
+        relevant_rule_ids = [rule_entry["rule"].rule_id for rule_entry in relevant_rules]
+
         # If LLM provided applied_rules, use them
         if "applied_rules" in decision_data and isinstance(decision_data["applied_rules"], list):
             provided_rules = [str(rule).upper() for rule in decision_data["applied_rules"]]
 
             # Validate that provided rules exist in relevant rules
-            relevant_rule_ids = [rule_entry["rule"].rule_id for rule_entry in relevant_rules]
-            valid_rules = [rule for rule in provided_rules if rule in relevant_rule_ids]
+            relevant_rule_id_set = set(relevant_rule_ids)
+            valid_rules = [rule for rule in provided_rules if rule in relevant_rule_id_set]
 
             if valid_rules:
                 logger.info(f"LLM provided applied rules: {valid_rules}")
@@ -474,12 +1449,9 @@ OUTPUT JSON FORMAT:
         if decision == "ALLOW":
             # For ALLOW decisions, include rules that were evaluated but not violated
             # This is less critical, so we can be conservative
-            rule_ids = [rule_entry["rule"].rule_id for rule_entry in relevant_rules]
-            if rule_ids:
-                logger.info(f"ALLOW decision: including evaluated rules: {rule_ids}")
-                return rule_ids
-            else:
-                return []
+            if relevant_rule_ids:
+                logger.info(f"ALLOW decision: including evaluated rules: {relevant_rule_ids}")
+            return relevant_rule_ids
 
         elif decision in ["BLOCK", "FLAG"]:
             # For BLOCK/FLAG decisions, we need to identify which rules were violated
@@ -487,16 +1459,16 @@ OUTPUT JSON FORMAT:
             applied_rules = []
 
             # Try to extract rule IDs from rationale
-            for rule_entry in relevant_rules:
-                rule_id = rule_entry["rule"].rule_id
+            for rule_id, rule_entry in zip(relevant_rule_ids, relevant_rules):
+                id_term, description_term = rule_entry["rationale_terms"]
                 # Check if rule ID is mentioned in rationale
-                if rule_id.lower() in rationale or rule_entry["rule"].description.lower() in rationale:
+                if id_term in rationale or description_term in rationale:
                     applied_rules.append(rule_id)
 
             # If no rules found in rationale, use all relevant rules as fallback
             if not applied_rules:
                 logger.warning(f"{decision} decision: no rules found in rationale, using all relevant rules")
-                applied_rules = [rule_entry["rule"].rule_id for rule_entry in relevant_rules]
+                applied_rules = relevant_rule_ids
 
             logger.info(f"{decision} decision: determined applied rules: {applied_rules}")
             return applied_rules
@@ -514,10 +1486,10 @@ OUTPUT JSON FORMAT:
             source_agent=action.source_agent,
             target_tool=action.target_tool,
             decision=DecisionEnum.BLOCK,
-            rationale=f"System error: {error_message}",
+            rationale=f"System error: {error_message}"[:1000],
             severity=SeverityEnum.HIGH,
             applied_rules=["SYSTEM-ERROR"],
-            timestamp=datetime.utcnow()
+            timestamp=datetime.now(timezone.utc)
         )
 
     def _validate_decision_format(self, data: dict) -> bool:
@@ -546,59 +1518,127 @@ OUTPUT JSON FORMAT:
             return False
 
     async def _get_relevant_policies(self, target_tool: str) -> List[Dict[str, Any]]:
-        """Retrieve policies for target tool using regex matching."""
+        """
+        Retrieve policies for target tool using regex matching. Results are
+        cached per tool until the next reload, so callers must not modify
+        the returned list.
+        """
+        # Negative cache: skip matching entirely for tools with no policies
+        if target_tool in self._no_policy_tools:
+            return []
+        cached = self._tool_matches.get(target_tool)
+        if cached is not None:
+            return cached
+
         relevant: List[Dict[str, Any]] = []
 
-        # Check cache for matching regex patterns
-        for regex_pattern, policy_entries in self._policy_cache.items():
-            try:
-                # Compile regex and check match
-                pattern = re.compile(regex_pattern)
-                if pattern.match(target_tool):
-                    relevant.extend(policy_entries)
-                    logger.debug(
-                        f"Matched tool '{target_tool}' with pattern '{regex_pattern}'"
-                    )
-            except re.error as e:
-                # If regex is invalid, do simple string match
-                logger.warning(f"Invalid regex pattern '{regex_pattern}': {e}")
-                if regex_pattern in target_tool:
-                    relevant.extend(policy_entries)
-                    logger.debug(
-                        f"Matched tool '{target_tool}' with substring '{regex_pattern}'"
-                    )
+        # Walk the literal-prefix trie along the tool name
+        matched: List[int] = []
+        node = self._prefix_trie
+        matched.extend(node.get("", ()))
+        for char in target_tool:
+            node = node.get(char)
+            if node is None:
+                break
+            matched.extend(node.get("", ()))
+
+        # One pass over the RE2 set and the combined regex, then any patterns
+        # that could not be fused
+        if self._pattern_set is not None:
+            hits = self._pattern_set.Match(target_tool)
+            if hits:
+                matched.extend(self._pattern_set_indices[hit] for hit in hits)
+        match = self._combined_re.match(target_tool) if self._combined_re else None
+        if match:
+            matched.extend(
+                int(name[1:]) for name, value in match.groupdict().items() if value is not None
+            )
+        if self._unfused_patterns:
+            matched.extend(idx for idx, pattern in self._unfused_patterns if pattern.match(target_tool))
+        # Overlapping alternatives can reach the same entry twice
+        for idx in sorted(set(matched)):
+            pattern, policy_entries = self._policy_cache[idx]
+            relevant.extend(policy_entries)
+            logger.debug(
+                f"Matched tool '{target_tool}' with pattern '{pattern.pattern}'"
+            )
+
+        if not relevant:
+            if len(self._no_policy_tools) < self._no_policy_tools_max_size:
+                self._no_policy_tools.add(target_tool)
+        elif len(self._tool_matches) < self._tool_matches_max_size:
+            self._tool_matches[target_tool] = relevant
 
         logger.debug(f"Found {len(relevant)} relevant rules for tool '{target_tool}'")
         return relevant
 
     def _format_policies_for_prompt(self, policies: List[Dict[str, Any]]) -> str:
-        """Format policies for injection into prompt."""
-        formatted: List[str] = []
-        for policy_entry in policies:
-            rule: PolicyRule = policy_entry["rule"]
-            formatted.append(
-                f"Rule ID: {rule.rule_id}\n"
-                f"Policy: {policy_entry['policy_name']}\n"
-                f"Description: {rule.description}\n"
-                f"Target Tool Pattern: {rule.target_tool_regex}\n"
-                f"Condition: {rule.condition_logic}\n"
-                f"Severity: {rule.severity}\n"
-                f"Action on Violation: {rule.action_on_violation}\n"
+        """
+        Format policies for injection into prompt, one compact line per rule.
+        The tool regex and policy name are left out: routing already used
+        them, and they stay in the audit log. Rules are sorted by rule_id so
+        the same rule set always yields byte-identical text, whatever order
+        the database returned policies in.
+        """
+        return "\n".join(
+            policy_entry["prompt_line"]
+            for policy_entry in sorted(
+                policies, key=lambda policy_entry: policy_entry["rule"].rule_id
             )
-        return "\n---\n".join(formatted)
+        )
 
-    async def _immediate_block_notification(
-        self, decision: Decision, action: InterceptedAction
+    @staticmethod
+    def _format_rule_for_prompt(rule: PolicyRule) -> str:
+        """One prompt line for a rule, rendered when the policy index is built."""
+        return (
+            f"- [{rule.rule_id}] {rule.description} | when: {rule.condition_logic} | "
+            f"violation: {rule.action_on_violation.value} ({rule.severity.value})"
+        )
+
+    def _notify_and_log_block(
+        self, decision: Decision, action: InterceptedAction, started: Optional[int] = None
     ) -> None:
+        """Queue the BLOCK alert and its audit record; close() drains both."""
+        if self._alert_sender is None or self._alert_sender.done():
+            # Alert sender not running - send with a tracked task instead
+            task = asyncio.create_task(self._immediate_block_notification(decision))
+            self._pending_logs.add(task)
+            task.add_done_callback(self._pending_logs.discard)
+        else:
+            self._alert_queue.put_nowait(decision)
+        self._log_decision_in_background(decision, action, started)
+
+    async def _send_block_alerts(self) -> None:
+        """Background sender: deliver queued BLOCK alerts in order."""
+        while True:
+            decision = await self._alert_queue.get()
+            try:
+                await self._immediate_block_notification(decision)
+            finally:
+                self._alert_queue.task_done()
+
+    def _block_alert_summary(self, decision: Decision) -> Dict[str, Any]:
+        """
+        Small BLOCK alert payload. Full tool arguments and user context stay
+        in audit_logs, where receivers can look them up by action_id.
+        """
+        return {
+            "type": "block_alert",
+            "action_id": decision.action_id,
+            "source_agent": decision.source_agent,
+            "target_tool": decision.target_tool,
+            "decision": decision.decision.value,
+            "rationale": decision.rationale,
+            "severity": decision.severity.value if decision.severity else None,
+            "applied_rules": decision.applied_rules,
+            "timestamp": decision.timestamp.isoformat(),
+            "urgency": "HIGH",
+        }
+
+    async def _immediate_block_notification(self, decision: Decision) -> None:
         """IMMEDIATE notification for BLOCK decisions."""
         try:
-            notification_payload = {
-                "type": "BLOCK_ALERT",
-                "decision": decision.dict(),
-                "action": action.dict(),
-                "timestamp": datetime.utcnow().isoformat(),
-                "urgency": "HIGH",
-            }
+            notification_payload = self._block_alert_summary(decision)
 
             # Send immediate notification
             await self.notify_service.send_immediate_alert(notification_payload)
@@ -610,63 +1650,164 @@ OUTPUT JSON FORMAT:
             # Don't raise - notification failure shouldn't break the flow
 
     async def _log_decision(
-        self, decision: Decision, action: InterceptedAction
+        self,
+        decision: Decision,
+        action: InterceptedAction,
+        started: Optional[int] = None,
     ) -> None:
         """Log decision to audit database."""
         try:
             await self.db_service.log_audit(
-                action_id=decision.action_id,
-                source_agent=decision.source_agent,
-                target_tool=decision.target_tool,
-                decision=decision.decision.value,
-                rationale=decision.rationale,
-                metadata={
-                    "tool_arguments": action.tool_arguments,
-                    "user_context": action.user_context,
-                    "severity": decision.severity.value
-                    if decision.severity
-                    else None,
-                    "processing_time_ms": int(
-                        (datetime.utcnow() - decision.timestamp).total_seconds() * 1000
-                    ),
-                },
-                applied_rules=decision.applied_rules,
+                **self._build_audit_record(decision, action, started)
             )
             logger.debug(f"Logged decision for action {decision.action_id}")
         except Exception as e:
             logger.error(f"Failed to log decision: {e}")
 
+    def _build_audit_record(
+        self,
+        decision: Decision,
+        action: InterceptedAction,
+        started: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Build the audit_logs record (log_audit keyword arguments) for a decision.
+        started is the time.monotonic_ns() value when processing began.
+        """
+        if started is not None:
+            processing_time_ms = (time.monotonic_ns() - started) // 1_000_000
+        else:
+            processing_time_ms = int(
+                (datetime.now(timezone.utc) - decision.timestamp).total_seconds() * 1000
+            )
+
+        return {
+            "action_id": decision.action_id,
+            "source_agent": decision.source_agent,
+            "target_tool": decision.target_tool,
+            "decision": decision.decision.value,
+            "rationale": decision.rationale,
+            "metadata": {
+                "tool_arguments": action.tool_arguments,
+                "user_context": action.user_context,
+                "severity": decision.severity.value if decision.severity else None,
+                "processing_time_ms": processing_time_ms,
+            },
+            "applied_rules": decision.applied_rules,
+        }
+
+    def _log_decision_in_background(
+        self, decision: Decision, action: InterceptedAction, started: Optional[int] = None
+    ) -> None:
+        """Queue the audit record for the batch writer; close() drains pending writes."""
+        if self._log_flusher is None or self._log_flusher.done():
+            # Batch writer not running - write with a tracked task instead
+            task = asyncio.create_task(self._log_decision(decision, action, started))
+            self._pending_logs.add(task)
+            task.add_done_callback(self._pending_logs.discard)
+            return
+
+        record = self._build_audit_record(decision, action, started)
+        try:
+            self._log_queue.put_nowait(record)
+        except asyncio.QueueFull:
+            # Never drop audit records: write this one on its own, still off the response path
+            logger.warning("Audit log queue full; writing record directly")
+            task = asyncio.create_task(self._log_decision(decision, action, started))
+            self._pending_logs.add(task)
+            task.add_done_callback(self._pending_logs.discard)
+
+    async def _flush_audit_logs(self) -> None:
+        """Background writer: drain the audit queue into batched inserts."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._log_queue.get()]
+            deadline = loop.time() + self._log_flush_interval
+            while len(batch) < self._log_batch_size:
+                try:
+                    batch.append(self._log_queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(
+                        await asyncio.wait_for(self._log_queue.get(), timeout=remaining)
+                    )
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                await self.db_service.log_audit_many(batch)
+                logger.debug(f"Logged {len(batch)} decisions")
+            except Exception as e:
+                logger.error(f"Failed to log {len(batch)} decisions: {e}")
+            finally:
+                for _ in batch:
+                    self._log_queue.task_done()
+
     def _update_stats(self, decision: Decision) -> None:
         """Update decision statistics."""
-        self._decision_stats["total"] += 1
-
-        if decision.decision == DecisionEnum.ALLOW:
-            self._decision_stats["allow"] += 1
-        elif decision.decision == DecisionEnum.BLOCK:
-            self._decision_stats["block"] += 1
-        elif decision.decision == DecisionEnum.FLAG:
-            self._decision_stats["flag"] += 1
+        self._decision_stats[_STAT_TOTAL] += 1
+        self._decision_stats[_DECISION_STAT_INDEX[decision.decision]] += 1
 
     def get_stats(self) -> Dict[str, Any]:
         """Get current decision statistics."""
-        total = self._decision_stats["total"]
+        total, allow, block, flag = self._decision_stats
         return {
             "total_decisions": total,
-            "allow_count": self._decision_stats["allow"],
-            "block_count": self._decision_stats["block"],
-            "flag_count": self._decision_stats["flag"],
-            "allow_rate": self._decision_stats["allow"] / total if total > 0 else 0,
-            "block_rate": self._decision_stats["block"] / total if total > 0 else 0,
-            "flag_rate": self._decision_stats["flag"] / total if total > 0 else 0,
+            "allow_count": allow,
+            "block_count": block,
+            "flag_count": flag,
+            "allow_rate": allow / total if total > 0 else 0,
+            "block_rate": block / total if total > 0 else 0,
+            "flag_rate": flag / total if total > 0 else 0,
             "cache_timestamp": self._cache_timestamp.isoformat()
             if self._cache_timestamp
             else None,
             "cache_size": len(self._policy_cache),
+            "policy_version": self._policy_version,
         }
 
     async def close(self) -> None:
         """Cleanup resources."""
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+        if self._listen_task is not None:
+            self._listen_task.cancel()
+            self._listen_task = None
+
+        # Let dispatched LLM batches finish; fail anything still waiting for a window
+        if self._llm_batcher is not None:
+            self._llm_batcher.cancel()
+            self._llm_batcher = None
+        if self._llm_batch_tasks:
+            await asyncio.gather(*self._llm_batch_tasks, return_exceptions=True)
+        while not self._llm_batch_queue.empty():
+            _, _, future = self._llm_batch_queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("ReasoningEngine is shutting down"))
+
+        # Deliver queued BLOCK alerts, then stop the sender
+        if self._alert_sender is not None:
+            if not self._alert_sender.done():
+                await self._alert_queue.join()
+            self._alert_sender.cancel()
+            self._alert_sender = None
+
+        # Wait for background audit writes, then stop the batch writer
+        if self._log_flusher is not None:
+            if not self._log_flusher.done():
+                await self._log_queue.join()
+            self._log_flusher.cancel()
+            self._log_flusher = None
+        if self._pending_logs:
+            await asyncio.gather(*self._pending_logs, return_exceptions=True)
+
         if self.llm_provider:
-            await self.llm_provider.close()
+            await LLMFactory.release_provider(self.llm_provider)
 
         logger.info(f"ReasoningEngine shutdown. Final stats: {self.get_stats()}")
\ No newline at end of file
@@ -2,12 +2,16 @@
 FIXED: Proper LLM Factory with working Watsonx and LMStudio providers
 """
 import os
-import json
+import time
 import asyncio
+from collections import deque
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional
+from functools import lru_cache
+from typing import AsyncIterator, Dict, Any, List, Optional, Type
 from dataclasses import dataclass
 
+from pydantic import BaseModel
+
 # Conditional imports based on availability
 try:
     from ibm_watsonx_ai import Credentials, WatsonxAI
@@ -16,11 +20,22 @@ except ImportError:
     WATSONX_AVAILABLE = False
 
 try:
-    from openai import AsyncOpenAI
+    import httpx
+    from openai import AsyncOpenAI, DEFAULT_TIMEOUT
     OPENAI_AVAILABLE = True
 except ImportError:
     OPENAI_AVAILABLE = False
 
+# Optional - h2 lets httpx multiplex calls over one HTTP/2 connection (TLS endpoints)
+try:
+    import h2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Output token budget for one call unless the caller asks for more
+DEFAULT_MAX_TOKENS = 1000
+
 @dataclass
 class LLMResponse:
     """Standardized response from any LLM"""
@@ -28,6 +43,71 @@ class LLMResponse:
     tool_calls: Optional[List[Dict]] = None
     finish_reason: Optional[str] = None
 
+@lru_cache(maxsize=None)
+def _json_schema_response_format(schema: Type[BaseModel]) -> Dict[str, Any]:
+    """OpenAI-style response_format for a Pydantic model, built once per model"""
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": schema.__name__,
+            "schema": schema.model_json_schema(),
+        },
+    }
+
+class ProviderUnavailableError(Exception):
+    """Raised without calling the provider while its circuit breaker is open"""
+    pass
+
+class CircuitBreaker:
+    """
+    Fast-fail guard for an LLM provider: opens after fail_threshold failures
+    within window seconds and rejects calls for cooldown seconds. After that
+    one trial call goes through per cooldown (half-open); its success closes
+    the breaker again.
+    """
+    
+    def __init__(self, fail_threshold: int = 20, window: float = 10.0, cooldown: float = 30.0):
+        self.fail_threshold = fail_threshold
+        self.window = window
+        self.cooldown = cooldown
+        self._failures: deque = deque()
+        self._opened_at: Optional[float] = None
+    
+    @property
+    def is_open(self) -> bool:
+        """True while calls are being rejected"""
+        return self._opened_at is not None and time.monotonic() - self._opened_at < self.cooldown
+    
+    def allow_request(self) -> bool:
+        """Check whether a call may go out; a half-open breaker lets one trial through"""
+        if self._opened_at is None:
+            return True
+        if self.is_open:
+            return False
+        # Re-arm the cooldown so concurrent callers wait for this trial
+        self._opened_at = time.monotonic()
+        return True
+    
+    def record_success(self) -> None:
+        """Close the breaker after a successful call"""
+        self._failures.clear()
+        self._opened_at = None
+    
+    def record_failure(self) -> None:
+        """Count a failed call, opening the breaker at the threshold"""
+        now = time.monotonic()
+        if self._opened_at is not None:
+            # Failed trial call - stay open for another cooldown
+            self._opened_at = now
+            return
+        
+        self._failures.append(now)
+        while self._failures and now - self._failures[0] > self.window:
+            self._failures.popleft()
+        if len(self._failures) >= self.fail_threshold:
+            self._opened_at = now
+            self._failures.clear()
+
 class BaseLLMProvider(ABC):
     """Abstract LLM provider interface"""
     
@@ -37,11 +117,50 @@ class BaseLLMProvider(ABC):
         prompt: str,
         system_prompt: Optional[str] = None,
         tools: Optional[List[Dict]] = None,
-        temperature: float = 0.1
+        temperature: float = 0.1,
+        cache_control: Optional[Dict[str, Any]] = None,
+        response_schema: Optional[Type[BaseModel]] = None,
+        max_tokens: int = DEFAULT_MAX_TOKENS
     ) -> LLMResponse:
-        """Invoke the LLM with given parameters"""
+        """
+        Invoke the LLM with given parameters
+        
+        cache_control marks the system prompt as a reusable prefix
+        (e.g. {"type": "ephemeral"}). Providers that cache prompt
+        prefixes automatically may ignore it.
+        
+        response_schema asks the provider to constrain output to JSON
+        matching the given Pydantic model, where structured output is
+        supported.
+        
+        max_tokens caps the length of the reply; callers expecting several
+        results in one reply should raise it accordingly.
+        """
         pass
     
+    async def invoke_stream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.1,
+        cache_control: Optional[Dict[str, Any]] = None,
+        response_schema: Optional[Type[BaseModel]] = None,
+        max_tokens: int = DEFAULT_MAX_TOKENS
+    ) -> AsyncIterator[str]:
+        """
+        Stream the LLM reply as text chunks, so callers can stop reading
+        early. Providers without streaming yield the full reply once.
+        """
+        response = await self.invoke(
+            prompt=prompt,
+            system_prompt=system_prompt,
+            temperature=temperature,
+            cache_control=cache_control,
+            response_schema=response_schema,
+            max_tokens=max_tokens
+        )
+        yield response.content
+    
     @abstractmethod
     async def close(self):
         """Clean up resources"""
@@ -65,7 +184,9 @@ class WatsonxProvider(BaseLLMProvider):
                 api_key=os.getenv("WATSONX_API_KEY"),
                 url=os.getenv("WATSONX_URL", "https://us-south.ml.cloud.ibm.com")
             )
-            self.client = WatsonxAI(
+            # The SDK is synchronous and may authenticate while constructing
+            self.client = await asyncio.to_thread(
+                WatsonxAI,
                 credentials=credentials,
                 project_id=self.project_id
             )
@@ -75,9 +196,16 @@ class WatsonxProvider(BaseLLMProvider):
         prompt: str,
         system_prompt: Optional[str] = None,
         tools: Optional[List[Dict]] = None,
-        temperature: float = 0.1
+        temperature: float = 0.1,
+        cache_control: Optional[Dict[str, Any]] = None,
+        response_schema: Optional[Type[BaseModel]] = None,
+        max_tokens: int = DEFAULT_MAX_TOKENS
     ) -> LLMResponse:
-        """Invoke Watsonx LLM with proper error handling"""
+        """Invoke Watsonx LLM with proper error handling
+        
+        Watsonx has no prompt-caching marker, so cache_control is ignored,
+        and response_schema is not enforced (callers still validate output).
+        """
         await self._initialize()
         
         try:
@@ -90,7 +218,7 @@ class WatsonxProvider(BaseLLMProvider):
             # Prepare parameters
             params = {
                 "temperature": temperature,
-                "max_tokens": 1000,
+                "max_tokens": max_tokens,
                 "top_p": 0.9,
             }
             
@@ -98,8 +226,10 @@ class WatsonxProvider(BaseLLMProvider):
             if tools:
                 params["tools"] = tools
             
-            # Make the API call
-            response = self.client.chat.create(
+            # Make the API call; the SDK blocks, so run it in a worker thread
+            # to keep the event loop serving other actions
+            response = await asyncio.to_thread(
+                self.client.chat.create,
                 model_id=self.model_id,
                 messages=messages,
                 **params
@@ -149,9 +279,16 @@ class LMStudioProvider(BaseLLMProvider):
     async def _initialize(self):
         """Initialize OpenAI-compatible client"""
         if self.client is None:
+            # Pooled keep-alive connections avoid a new TCP/TLS handshake per call;
+            # HTTPS endpoints also multiplex over HTTP/2 when h2 is installed
             self.client = AsyncOpenAI(
                 base_url=self.base_url,
-                api_key="lm-studio"  # LM Studio doesn't require a real key
+                api_key="lm-studio",  # LM Studio doesn't require a real key
+                http_client=httpx.AsyncClient(
+                    http2=HTTP2_AVAILABLE,
+                    limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+                    timeout=DEFAULT_TIMEOUT
+                )
             )
     
     async def invoke(
@@ -159,9 +296,18 @@ class LMStudioProvider(BaseLLMProvider):
         prompt: str,
         system_prompt: Optional[str] = None,
         tools: Optional[List[Dict]] = None,
-        temperature: float = 0.1
+        temperature: float = 0.1,
+        cache_control: Optional[Dict[str, Any]] = None,
+        response_schema: Optional[Type[BaseModel]] = None,
+        max_tokens: int = DEFAULT_MAX_TOKENS
     ) -> LLMResponse:
-        """Invoke LM Studio using OpenAI-compatible API"""
+        """Invoke LM Studio using OpenAI-compatible API
+        
+        OpenAI-compatible servers cache identical prompt prefixes
+        automatically, so cache_control needs no wire-level marker here;
+        keeping the system prompt byte-identical is what enables the hit.
+        response_schema is sent as a json_schema response_format.
+        """
         await self._initialize()
         
         try:
@@ -176,9 +322,13 @@ class LMStudioProvider(BaseLLMProvider):
                 "model": self.model,
                 "messages": messages,
                 "temperature": temperature,
-                "max_tokens": 1000,
+                "max_tokens": max_tokens,
             }
             
+            # Constrain output to the schema (OpenAI structured outputs format)
+            if response_schema is not None:
+                params["response_format"] = _json_schema_response_format(response_schema)
+            
             # Add tools if provided (OpenAI format)
             if tools:
                 params["tools"] = tools
@@ -213,15 +363,58 @@ class LMStudioProvider(BaseLLMProvider):
         except Exception as e:
             raise Exception(f"LM Studio API error: {str(e)}")
     
+    async def invoke_stream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.1,
+        cache_control: Optional[Dict[str, Any]] = None,
+        response_schema: Optional[Type[BaseModel]] = None,
+        max_tokens: int = DEFAULT_MAX_TOKENS
+    ) -> AsyncIterator[str]:
+        """Stream LM Studio content deltas; closing the generator closes the HTTP stream"""
+        await self._initialize()
+        
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": prompt})
+        
+        params = {
+            "model": self.model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "stream": True,
+        }
+        if response_schema is not None:
+            params["response_format"] = _json_schema_response_format(response_schema)
+        
+        try:
+            stream = await self.client.chat.completions.create(**params)
+        except Exception as e:
+            raise Exception(f"LM Studio API error: {str(e)}")
+        
+        try:
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except Exception as e:
+            raise Exception(f"LM Studio API error: {str(e)}")
+        finally:
+            await stream.close()
+    
     async def close(self):
         """Cleanup - close OpenAI client"""
         if self.client:
             await self.client.close()
+            self.client = None
 
 class LLMFactory:
     """Factory for creating LLM provider instances with lazy loading"""
     
     _instances = {}
+    _refcounts = {}
     
     @staticmethod
     async def get_provider(provider_name: str = None) -> BaseLLMProvider:
@@ -237,8 +430,9 @@ class LLMFactory:
         
         provider_name = provider_name.lower()
         
-        # Return cached instance
+        # Return cached instance, shared by every caller
         if provider_name in LLMFactory._instances:
+            LLMFactory._refcounts[provider_name] += 1
             return LLMFactory._instances[provider_name]
         
         # Create new instance based on provider
@@ -256,11 +450,28 @@ class LLMFactory:
         
         # Cache and return
         LLMFactory._instances[provider_name] = provider
+        LLMFactory._refcounts[provider_name] = 1
         return provider
     
+    @staticmethod
+    async def release_provider(provider: BaseLLMProvider):
+        """Release a provider from get_provider; it is closed when no users remain"""
+        for name, instance in list(LLMFactory._instances.items()):
+            if instance is provider:
+                LLMFactory._refcounts[name] -= 1
+                if LLMFactory._refcounts[name] <= 0:
+                    del LLMFactory._instances[name]
+                    del LLMFactory._refcounts[name]
+                    await provider.close()
+                return
+        
+        # Not managed by the factory
+        await provider.close()
+    
     @staticmethod
     async def close_all():
         """Close all provider instances"""
         for provider in LLMFactory._instances.values():
             await provider.close()
-        LLMFactory._instances.clear()
\ No newline at end of file
+        LLMFactory._instances.clear()
+        LLMFactory._refcounts.clear()
\ No newline at end of file
@@ -0,0 +1,125 @@
+"""
+JSON helpers that use orjson when available and fall back to the stdlib json module
+"""
+import json
+from typing import Any, Iterator, Optional, Union
+
+# Conditional import - orjson is an optional accelerator
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers can keep
+# catching the stdlib exception regardless of which parser ran
+JSONDecodeError = json.JSONDecodeError
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Parse a JSON document"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def dumps(obj: Any, sort_keys: bool = False) -> str:
+    """Serialize to compact JSON text (no indentation or separator spaces)"""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS if sort_keys else None).decode("utf-8")
+        except TypeError:
+            # e.g. non-string dict keys, which the stdlib coerces
+            pass
+    return json.dumps(obj, separators=(",", ":"), sort_keys=sort_keys)
+
+def dumps_bytes(obj: Any, sort_keys: bool = False) -> bytes:
+    """Serialize to compact UTF-8 JSON bytes, e.g. for hashing (orjson's native output)"""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS if sort_keys else None)
+        except TypeError:
+            pass
+    return json.dumps(obj, separators=(",", ":"), sort_keys=sort_keys).encode("utf-8")
+
+class ObjectScanner:
+    """
+    Incremental scanner that finds where the first top-level JSON object (or,
+    with "[" in openers, array) in a text stream ends, tracking bracket depth
+    and string literals in one pass
+    """
+
+    __slots__ = ("openers", "depth", "in_string", "escape", "start", "end", "_offset")
+
+    def __init__(self, openers: str = "{"):
+        self.openers = openers
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.start: Optional[int] = None  # Offset of the opening bracket
+        self.end: Optional[int] = None  # Offset just past the closing bracket
+        self._offset = 0
+
+    def feed(self, chunk: str, pos: int = 0) -> bool:
+        """Scan the next chunk from index pos; returns True once the first value is complete"""
+        if self.end is not None:
+            return True
+
+        for i in range(pos, len(chunk)):
+            char = chunk[i]
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif char == "\\":
+                    self.escape = True
+                elif char == '"':
+                    self.in_string = False
+            elif self.start is None:
+                # Text before the value, strings there included, is skipped
+                if char in self.openers:
+                    self.start = self._offset + i
+                    self.depth = 1
+            elif char == '"':
+                self.in_string = True
+            elif char == "{" or char == "[":
+                self.depth += 1
+            elif char == "}" or char == "]":
+                self.depth -= 1
+                if self.depth == 0:
+                    self.end = self._offset + i + 1
+                    return True
+
+        self._offset += len(chunk)
+        return False
+
+def extract_object(text: str, openers: str = "{") -> Optional[str]:
+    """
+    Return the first balanced {...} substring of text (or [...] with "[" in
+    openers) that parses as JSON. A balanced span that doesn't parse is
+    skipped whole, so the scan resumes after it and each character is
+    scanned once (linear overall, no regex). An opening bracket that never
+    closes (e.g. a truncated reply) ends the search.
+    """
+    resume = 0
+    for start in _opener_positions(text, openers):
+        if start < resume:
+            continue  # Inside a span that already failed to parse
+        scanner = ObjectScanner(openers)
+        if not scanner.feed(text, start):
+            return None
+        candidate = text[start:scanner.end]
+        try:
+            loads(candidate)
+            return candidate
+        except JSONDecodeError:
+            resume = scanner.end
+    return None
+
+def _opener_positions(text: str, openers: str) -> Iterator[int]:
+    """Ascending indexes of opener characters; each find resumes where it stopped"""
+    found = {opener: text.find(opener) for opener in openers}
+    while True:
+        pending = [index for index in found.values() if index != -1]
+        if not pending:
+            return
+        index = min(pending)
+        yield index
+        found[text[index]] = text.find(text[index], index + 1)
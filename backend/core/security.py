@@ -9,6 +9,8 @@ from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status
 
+from backend.core import jsonutil
+
 # JWT Configuration from environment variables
 # Generate a secure random secret if not provided
 DEFAULT_SECRET_KEY = secrets.token_urlsafe(32)
@@ -132,8 +134,7 @@ def validate_interception_request(data: Dict[str, Any]) -> bool:
     
     # Ensure tool_arguments is JSON serializable
     try:
-        import json
-        json.dumps(tool_args)
+        jsonutil.dumps(tool_args)
     except (TypeError, ValueError):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
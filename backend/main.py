@@ -19,6 +19,7 @@ from backend.schemas.models import (
     InterceptedAction,
     DecisionResponse,
     PolicyArchitectRequest,
+    PolicyArchitectBatchRequest,
     MCPContextRequest,
     AgentHealth,
 )
@@ -26,6 +27,12 @@ from backend.services.db import DatabaseService
 from backend.services.notify import NotificationService
 from backend.services.mcp_client import MCPClient
 
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
 # Security
@@ -211,6 +218,10 @@ async def analyze_policy(
             existing_policy_ids=request.existing_policy_ids,
         )
 
+        # Add the new rules to the reasoning engine without a full reload
+        if result.rules_created and hasattr(app.state, "engine"):
+            await app.state.engine.add_policies(result.created_policies)
+
         return {
             "status": "success",
             "policy_id": result.policy_id,
@@ -228,6 +239,60 @@ async def analyze_policy(
         )
 
 
+@app.post("/policy/analyze/batch")
+async def analyze_policies_batch(
+    request: PolicyArchitectBatchRequest,
+    current_user: dict = Depends(get_current_user),
+):
+    """Batched Policy Architect endpoint - converts several policies with fewer LLM calls."""
+    try:
+        logger.info(
+            f"📋 Batch analysis of {len(request.policy_texts)} policies requested by "
+            f"{current_user.get('sub', 'unknown')}"
+        )
+
+        results = await app.state.architect.analyze_policies_batch(request.policy_texts)
+
+        # Add the new rules to the reasoning engine without a full reload
+        if hasattr(app.state, "engine"):
+            await app.state.engine.add_policies(
+                [
+                    policy
+                    for result in results
+                    if not isinstance(result, Exception)
+                    for policy in result.created_policies
+                ]
+            )
+
+        policies = []
+        for result in results:
+            if isinstance(result, Exception):
+                policies.append({"status": "error", "error": str(result)})
+            else:
+                policies.append(
+                    {
+                        "status": "success",
+                        "policy_id": result.policy_id,
+                        "policy_name": result.policy_name,
+                        "rules_created": result.rules_created,
+                        "conflicts_detected": result.conflicts_detected,
+                    }
+                )
+
+        return {
+            "status": "success",
+            "policies": policies,
+            "message": f"Processed {len(policies)} policies",
+        }
+
+    except Exception as e:
+        logger.error(f"Batch policy analysis failed: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Batch policy analysis failed: {str(e)}",
+        )
+
+
 @app.post("/mcp/context")
 async def get_mcp_context(
     request: MCPContextRequest,
@@ -371,6 +436,19 @@ async def add_security_headers(request: Request, call_next):
 
 
 if __name__ == "__main__":
+    import asyncio
     import uvicorn
 
-    uvicorn.run("backend.main:app", host="0.0.0.0", port=8000, reload=True, log_level="info")
\ No newline at end of file
+    # libuv-based event loop when available; uvicorn is told too, since the
+    # reloader serves the app from a separate worker process
+    if UVLOOP_AVAILABLE:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+    uvicorn.run(
+        "backend.main:app",
+        host="0.0.0.0",
+        port=8000,
+        reload=True,
+        log_level="info",
+        loop="uvloop" if UVLOOP_AVAILABLE else "asyncio",
+    )
\ No newline at end of file
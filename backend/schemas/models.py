@@ -6,7 +6,8 @@ from typing import Dict, Any, Optional, List
 from datetime import datetime
 from enum import Enum
 import re
-import json
+
+from backend.core import jsonutil
 
 class DecisionEnum(str, Enum):
     ALLOW = "ALLOW"
@@ -39,7 +40,7 @@ class InterceptedAction(BaseModel):
     def validate_tool_arguments(cls, v):
         """Ensure tool_arguments is JSON serializable"""
         try:
-            json.dumps(v)
+            jsonutil.dumps(v)
             return v
         except TypeError as e:
             raise ValueError(f"tool_arguments must be JSON serializable: {e}")
@@ -132,12 +133,40 @@ class Decision(BaseModel):
             
         return v
 
+class LLMDecisionOutput(BaseModel):
+    """Structured decision the Ethical Reasoner LLM must return"""
+    decision: DecisionEnum
+    rationale: str = Field(min_length=1)
+    severity: Optional[SeverityEnum] = None
+    applied_rules: List[str] = Field(default_factory=list)
+
+class LLMBatchDecisionItem(LLMDecisionOutput):
+    """One action's decision inside a batched Ethical Reasoner reply"""
+    action_id: str
+
+class LLMBatchDecisionOutput(BaseModel):
+    """Structured reply for a batch of actions evaluated in one LLM call"""
+    results: List[LLMBatchDecisionItem]
+
 class PolicyArchitectRequest(BaseModel):
     """Request for Policy Architect"""
     policy_text: str = Field(min_length=10, max_length=10000)
     source_document_type: Optional[str] = Field(default=None)
     existing_policy_ids: Optional[List[str]] = Field(default_factory=list)
 
+class PolicyArchitectBatchRequest(BaseModel):
+    """Request for batched Policy Architect analysis"""
+    policy_texts: List[str] = Field(min_length=1, max_length=50)
+    
+    @field_validator('policy_texts')
+    @classmethod
+    def validate_policy_texts(cls, v):
+        """Apply the single-request length limits to every policy text"""
+        for text in v:
+            if not 10 <= len(text) <= 10000:
+                raise ValueError("Each policy text must be between 10 and 10000 characters")
+        return v
+
 class MCPContextRequest(BaseModel):
     """Request for MCP context fetching"""
     tool_name: str
@@ -3,15 +3,53 @@ FIXED: Fully asynchronous DatabaseService with asyncio locks and async sleep
 """
 import os
 import asyncio
-from typing import List, Dict, Any, Optional
+import bisect
+from typing import Callable, List, Dict, Any, Optional
 from datetime import datetime, timedelta
-import json
-from functools import wraps
+import re
+from functools import lru_cache
 import logging
 from supabase import create_client, Client
 
+# Conditional import - psycopg2 is only needed for LISTEN/NOTIFY policy updates
+try:
+    import psycopg2
+    import psycopg2.extensions
+    PSYCOPG2_AVAILABLE = True
+except ImportError:
+    PSYCOPG2_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Channel the notify_policies_changed trigger (setup.sql) notifies on
+POLICY_CHANGE_CHANNEL = "policy_change"
+
+# Leading literal characters of a policy regex (an optional '^' anchor is skipped)
+_LITERAL_PREFIX_RE = re.compile(r'^\^?([A-Za-z0-9_\-]*)(.?)')
+
+def _literal_prefix(pattern: str) -> str:
+    """
+    Literal text that every tool matched by the (start-anchored) pattern
+    must begin with. Returns '' when no safe prefix can be derived.
+    """
+    if "|" in pattern:
+        # Top-level alternation means different branches have different prefixes
+        return ""
+    match = _LITERAL_PREFIX_RE.match(pattern)
+    prefix, next_char = match.group(1), match.group(2)
+    if next_char in ("?", "*", "{"):
+        # The last literal character is optional
+        prefix = prefix[:-1]
+    return prefix
+
+@lru_cache(maxsize=1024)
+def _compile_policy_regex(pattern: str) -> Optional[re.Pattern]:
+    """Compile a policy target_tool_regex once; invalid patterns return None"""
+    try:
+        return re.compile(pattern)
+    except re.error:
+        return None
+
 class DatabaseService:
     """
     FIXED: Fully async singleton database client
@@ -31,6 +69,13 @@ class DatabaseService:
         self.is_initialized = False
         self.connection_attempts = 0
         self.last_connection_time = None
+        
+        # Short-lived cache of active policies used by conflict checks
+        self._active_policies_cache: Optional[List[Dict]] = None
+        self._active_policies_cached_at: Optional[datetime] = None
+        self._active_policies_ttl = 30  # seconds
+        self._prefix_index: Dict[str, List[Dict]] = {}
+        self._prefix_keys: List[str] = []
     
     @staticmethod
     async def get_instance():
@@ -146,27 +191,154 @@ class DatabaseService:
         response = self.supabase.table("audit_logs").insert(data).execute()
         return response.data[0] if response.data else None
     
+    async def log_audit_many(self, records: List[Dict[str, Any]]) -> int:
+        """
+        Log several decisions to audit_logs in one insert with retry.
+        Each record takes the same keys as log_audit's arguments.
+        """
+        if not records:
+            return 0
+        return await self._with_retry(self._log_audit_many_internal, records)
+    
+    async def _log_audit_many_internal(self, records: List[Dict[str, Any]]) -> int:
+        """Internal batched audit logging method"""
+        created_at = datetime.utcnow().isoformat()
+        rows = [
+            {
+                "action_id": record["action_id"],
+                "source_agent": record["source_agent"],
+                "target_tool": record["target_tool"],
+                "decision": record["decision"],
+                "rationale": record["rationale"],
+                "metadata": record.get("metadata") or {},
+                "applied_rules": record.get("applied_rules") or [],
+                "created_at": record.get("created_at") or created_at
+            }
+            for record in records
+        ]
+        
+        response = await asyncio.to_thread(
+            self.supabase.table("audit_logs").insert(rows).execute
+        )
+        return len(response.data) if response.data else 0
+    
     async def get_active_policies(self) -> List[Dict]:
         """Get all active policies with retry"""
         return await self._with_retry(self._get_active_policies_internal)
     
     async def _get_active_policies_internal(self) -> List[Dict]:
         """Internal method to get active policies"""
-        response = self.supabase.table("policies") \
-            .select("*") \
-            .eq("is_active", True) \
-            .execute()
+        # Run the synchronous client in a worker thread so policy refreshes
+        # don't block request handling
+        response = await asyncio.to_thread(
+            self.supabase.table("policies")
+            .select("*")
+            .eq("is_active", True)
+            .execute
+        )
         return response.data
     
+    async def get_policies_version(self) -> str:
+        """
+        Cheap change marker for the policies table: active policy count plus
+        the latest updated_at (kept current by the update_policies_updated_at trigger)
+        """
+        return await self._with_retry(self._get_policies_version_internal)
+    
+    async def _get_policies_version_internal(self) -> str:
+        """Internal method to get the policies change marker"""
+        latest, active = await asyncio.gather(
+            asyncio.to_thread(
+                self.supabase.table("policies")
+                .select("updated_at")
+                .order("updated_at", desc=True)
+                .limit(1)
+                .execute
+            ),
+            asyncio.to_thread(
+                self.supabase.table("policies")
+                .select("id", count="exact")
+                .eq("is_active", True)
+                .limit(1)
+                .execute
+            ),
+        )
+        updated_at = latest.data[0]["updated_at"] if latest.data else None
+        return f"{active.count or 0}:{updated_at}"
+    
+    async def listen_policy_changes(self, on_change: Callable[[], None]) -> None:
+        """
+        Call on_change whenever the policies table changes (Postgres LISTEN on
+        POLICY_CHANGE_CHANNEL). Runs until cancelled or the connection fails.
+        Requires SUPABASE_DB_URL, a direct Postgres connection string.
+        """
+        dsn = os.getenv("SUPABASE_DB_URL")
+        if not dsn:
+            raise RuntimeError("SUPABASE_DB_URL is not set")
+        if not PSYCOPG2_AVAILABLE:
+            raise RuntimeError("psycopg2 not installed. Run: pip install psycopg2-binary")
+        
+        conn = await asyncio.to_thread(self._connect_listener, dsn)
+        loop = asyncio.get_running_loop()
+        failed = loop.create_future()
+        
+        def on_readable():
+            try:
+                conn.poll()
+            except Exception as e:
+                if not failed.done():
+                    failed.set_exception(e)
+                return
+            if conn.notifies:
+                conn.notifies.clear()
+                on_change()
+        
+        # Notifications are read when the socket is readable; no polling thread
+        loop.add_reader(conn.fileno(), on_readable)
+        logger.info(f"Listening for policy changes on '{POLICY_CHANGE_CHANNEL}'")
+        try:
+            await failed
+        finally:
+            loop.remove_reader(conn.fileno())
+            conn.close()
+    
+    @staticmethod
+    def _connect_listener(dsn: str):
+        """Open an autocommit connection subscribed to POLICY_CHANGE_CHANNEL"""
+        conn = psycopg2.connect(dsn)
+        conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        with conn.cursor() as cursor:
+            cursor.execute(f"LISTEN {POLICY_CHANGE_CHANNEL};")
+        return conn
+    
     async def create_policy(self, policy_data: Dict) -> Dict:
         """Create new policy with retry"""
         return await self._with_retry(self._create_policy_internal, policy_data)
     
     async def _create_policy_internal(self, policy_data: Dict) -> Dict:
         """Internal method to create policy"""
-        response = self.supabase.table("policies").insert(policy_data).execute()
+        # The Supabase client is synchronous; run it in a worker thread so
+        # concurrent inserts overlap instead of blocking the event loop
+        response = await asyncio.to_thread(
+            self.supabase.table("policies").insert(policy_data).execute
+        )
+        self._active_policies_cache = None  # New policy invalidates conflict-check cache
         return response.data[0] if response.data else None
     
+    async def create_policies(self, policies_data: List[Dict]) -> List[Dict]:
+        """Create several policies in one insert with retry"""
+        if not policies_data:
+            return []
+        return await self._with_retry(self._create_policies_internal, policies_data)
+    
+    async def _create_policies_internal(self, policies_data: List[Dict]) -> List[Dict]:
+        """Internal method to create several policies in one round trip"""
+        response = await asyncio.to_thread(
+            self.supabase.table("policies").insert(policies_data).execute
+        )
+        self._active_policies_cache = None  # New policies invalidate conflict-check cache
+        return response.data or []
+    
     async def check_policy_conflicts(self, new_rule: Dict) -> List[Dict]:
         """FIXED: Use PostgreSQL function for conflict detection"""
         try:
@@ -187,6 +359,80 @@ class DatabaseService:
             # Fall back to Python implementation
             return await self._python_fallback_conflict_check(new_rule)
     
+    async def check_policy_conflicts_batch(self, new_rules: List[Dict]) -> List[Dict]:
+        """Check several new rules for conflicts in a single database round-trip"""
+        if not new_rules:
+            return []
+        
+        try:
+            # Synchronous client call; keep it off the event loop
+            response = await asyncio.to_thread(
+                self.supabase.rpc(
+                    'check_policy_conflicts_batch',
+                    {'new_rules': new_rules}
+                ).execute
+            )
+            
+            return response.data if response.data else []
+            
+        except Exception as e:
+            logger.error(f"Error calling PostgreSQL batch conflict function: {e}")
+            # Fall back to Python implementation, fetching active policies only once
+            await self._get_active_policies_cached()
+            conflicts = []
+            for new_rule in new_rules:
+                # Same keys as the SQL batch function, which tags each conflict
+                # with the new rule it was found for
+                for conflict in await self._python_fallback_conflict_check(new_rule):
+                    conflict["new_rule_id"] = new_rule.get("rule_id", "unknown")
+                    conflicts.append(conflict)
+            return conflicts
+    
+    async def _get_active_policies_cached(self) -> List[Dict]:
+        """Get active policies for conflict checks, cached for a short TTL"""
+        now = datetime.utcnow()
+        if (
+            self._active_policies_cache is None
+            or now - self._active_policies_cached_at > timedelta(seconds=self._active_policies_ttl)
+        ):
+            self._active_policies_cache = await self.get_active_policies()
+            self._active_policies_cached_at = now
+            self._build_prefix_index(self._active_policies_cache)
+        return self._active_policies_cache
+    
+    def _build_prefix_index(self, active_policies: List[Dict]) -> None:
+        """Index active policies by the literal prefix of their target_tool_regex"""
+        index: Dict[str, List[Dict]] = {}
+        for policy in active_policies:
+            policy_rules = policy.get("rules", {})
+            if isinstance(policy_rules, dict):
+                prefix = _literal_prefix(policy_rules.get("target_tool_regex", ""))
+                index.setdefault(prefix, []).append(policy)
+        self._prefix_index = index
+        self._prefix_keys = sorted(index)
+    
+    def _conflict_candidates(self, target_regex: str) -> List[Dict]:
+        """
+        Active policies whose regex could match the same tools as target_regex.
+        Two anchored patterns can only overlap when one literal prefix is a
+        prefix of the other, so only those buckets are returned.
+        """
+        prefix = _literal_prefix(target_regex)
+        candidates: List[Dict] = []
+        
+        # Buckets whose prefix is a prefix of ours (including the '' bucket)
+        for end in range(len(prefix)):
+            candidates.extend(self._prefix_index.get(prefix[:end], []))
+        
+        # Buckets whose prefix starts with ours
+        start = bisect.bisect_left(self._prefix_keys, prefix)
+        for key in self._prefix_keys[start:]:
+            if not key.startswith(prefix):
+                break
+            candidates.extend(self._prefix_index[key])
+        
+        return candidates
+    
     async def _python_fallback_conflict_check(self, new_rule: Dict) -> List[Dict]:
         """Fallback Python implementation for conflict detection"""
         conflicts = []
@@ -194,28 +440,26 @@ class DatabaseService:
         new_severity = new_rule.get("severity", "MEDIUM")
         new_action = new_rule.get("action_on_violation", "BLOCK")
         
-        # Get all active policies
-        active_policies = await self.get_active_policies()
+        # Only scan active policies whose literal prefix is compatible
+        await self._get_active_policies_cached()
         
-        for policy in active_policies:
+        for policy in self._conflict_candidates(target_regex):
             policy_rules = policy.get("rules", {})
+            existing_regex = policy_rules.get("target_tool_regex", "")
+            existing_action = policy_rules.get("action_on_violation", "BLOCK")
             
-            if isinstance(policy_rules, dict):
-                existing_regex = policy_rules.get("target_tool_regex", "")
-                existing_action = policy_rules.get("action_on_violation", "BLOCK")
-                
-                # Improved regex overlap detection
-                if self._regexes_overlap_improved(target_regex, existing_regex):
-                    if self._actions_conflict(new_action, existing_action):
-                        conflicts.append({
-                            "policy_id": policy.get("id"),
-                            "policy_name": policy.get("name", "Unnamed"),
-                            "rule_id": policy_rules.get("rule_id", "unknown"),
-                            "severity": policy_rules.get("severity", "MEDIUM"),
-                            "action": existing_action,
-                            "conflict_type": "action_conflict",
-                            "description": f"New rule '{new_rule.get('rule_id', 'unknown')}' conflicts with existing rule '{policy_rules.get('rule_id', 'unknown')}'"
-                        })
+            # Improved regex overlap detection
+            if self._regexes_overlap_improved(target_regex, existing_regex):
+                if self._actions_conflict(new_action, existing_action):
+                    conflicts.append({
+                        "policy_id": policy.get("id"),
+                        "policy_name": policy.get("name", "Unnamed"),
+                        "rule_id": policy_rules.get("rule_id", "unknown"),
+                        "severity": policy_rules.get("severity", "MEDIUM"),
+                        "action": existing_action,
+                        "conflict_type": "action_conflict",
+                        "description": f"New rule '{new_rule.get('rule_id', 'unknown')}' conflicts with existing rule '{policy_rules.get('rule_id', 'unknown')}'"
+                    })
         
         return conflicts
     
@@ -232,6 +476,13 @@ class DatabaseService:
         if regex1 in regex2 or regex2 in regex1:
             return True
         
+        # Check if either pattern matches the other's literal text
+        # (e.g. 'Slack_API_.*' vs 'Slack_API_PostMessage')
+        compiled1 = _compile_policy_regex(regex1)
+        compiled2 = _compile_policy_regex(regex2)
+        if (compiled1 and compiled1.match(regex2)) or (compiled2 and compiled2.match(regex1)):
+            return True
+        
         # Check for common patterns
         patterns_to_check = [
             (r'\*', '.*'),
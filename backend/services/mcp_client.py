@@ -2,7 +2,6 @@
 FIXED: Added missing hashlib import and improved error handling
 """
 import httpx
-import json
 import hashlib  # FIXED: Added missing import
 from typing import Dict, Any, List, Optional
 from dataclasses import dataclass
@@ -11,6 +10,8 @@ import asyncio
 from enum import Enum
 import logging
 
+from backend.core import jsonutil
+
 logger = logging.getLogger(__name__)
 
 class ContextType(Enum):
@@ -106,7 +107,7 @@ class MCPClient:
         cache_key = self._create_cache_key(tool_name, tool_arguments, context_type)
         cached = self.cache.get(cache_key)
         
-        if cached and (datetime.utcnow() - cached.fetched_at).seconds < 60:
+        if cached and (datetime.utcnow() - cached.fetched_at).total_seconds() < 60:
             # Return cached result if less than 60 seconds old
             logger.debug(f"Returning cached result for {cache_key}")
             return cached
@@ -211,7 +212,7 @@ class MCPClient:
     ) -> str:
         """Create cache key from request parameters"""
         # Sort arguments to ensure consistent keys
-        sorted_args = json.dumps(tool_arguments, sort_keys=True)
+        sorted_args = jsonutil.dumps(tool_arguments, sort_keys=True)
         # FIXED: Now hashlib is imported
         return f"{tool_name}:{context_type}:{hashlib.md5(sorted_args.encode()).hexdigest()}"
     
@@ -6,11 +6,12 @@ import asyncio
 import httpx
 from typing import Dict, Any, List, Optional, Set
 from datetime import datetime
-import json
 from enum import Enum
 from threading import Lock
 import logging
 
+from backend.core import jsonutil
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -218,12 +219,17 @@ class NotificationService:
     ) -> bool:
         """Send single webhook request with retry logic (async)."""
         max_retries = 2  # Fewer retries for async notifications
+        try:
+            body = jsonutil.dumps_bytes(payload)  # Encoded once for all attempts
+        except (TypeError, ValueError) as e:
+            logger.error(f"Webhook payload for {url} could not be encoded: {e}")
+            return False
 
         for attempt in range(max_retries):
             try:
                 response = await self.http_client.post(
                     url,
-                    json=payload,
+                    content=body,
                     headers={
                         "Content-Type": "application/json",
                         "User-Agent": "OrchestraGuard/2.0",
@@ -252,12 +258,17 @@ class NotificationService:
     ) -> bool:
         """Send single webhook request with retry logic (sync)."""
         max_retries = 3  # More retries for synchronous notifications
+        try:
+            body = jsonutil.dumps_bytes(payload)  # Encoded once for all attempts
+        except (TypeError, ValueError) as e:
+            logger.error(f"Webhook payload for {url} could not be encoded: {e}")
+            return False
 
         for attempt in range(max_retries):
             try:
                 response = await self.http_client.post(
                     url,
-                    json=payload,
+                    content=body,
                     headers={
                         "Content-Type": "application/json",
                         "User-Agent": "OrchestraGuard/2.0",
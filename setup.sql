@@ -146,6 +146,42 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
+-- Function to check conflicts for several new rules in one call
+CREATE OR REPLACE FUNCTION check_policy_conflicts_batch(new_rules JSONB)
+RETURNS TABLE (
+    new_rule_id TEXT,
+    policy_id UUID,
+    policy_name TEXT,
+    rule_id TEXT,
+    severity TEXT,
+    action TEXT,
+    conflict_type TEXT,
+    description TEXT
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        COALESCE(r->>'rule_id', 'unknown') as new_rule_id,
+        c.policy_id,
+        c.policy_name,
+        c.rule_id,
+        c.severity,
+        c.action,
+        c.conflict_type,
+        format(
+            'New rule ''%s'' conflicts with existing rule ''%s''',
+            COALESCE(r->>'rule_id', 'unknown'),
+            COALESCE(c.rule_id, 'unknown')
+        ) as description
+    FROM jsonb_array_elements(new_rules) AS r
+    CROSS JOIN LATERAL check_policy_conflicts(
+        COALESCE(r->>'target_tool_regex', ''),
+        COALESCE(r->>'severity', 'MEDIUM'),
+        COALESCE(r->>'action_on_violation', 'BLOCK')
+    ) AS c;
+END;
+$$ LANGUAGE plpgsql;
+
 -- Function to update updated_at timestamp
 CREATE OR REPLACE FUNCTION update_updated_at_column()
 RETURNS TRIGGER AS $$
@@ -155,6 +191,15 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
+-- Function to tell listening engines that policies changed
+CREATE OR REPLACE FUNCTION notify_policy_change()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify('policy_change', '');
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
 -- ========== TRIGGERS ==========
 
 -- Trigger for automatic updated_at on policies
@@ -163,6 +208,12 @@ CREATE TRIGGER update_policies_updated_at
     FOR EACH ROW
     EXECUTE FUNCTION update_updated_at_column();
 
+-- Trigger for policy change notifications (LISTEN policy_change)
+CREATE TRIGGER notify_policies_changed
+    AFTER INSERT OR UPDATE OR DELETE ON policies
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION notify_policy_change();
+
 -- Trigger for automatic updated_at on users
 CREATE TRIGGER update_users_updated_at
     BEFORE UPDATE ON users
@@ -253,7 +304,7 @@ BEGIN
     RAISE NOTICE '📊 Tables created: policies, audit_logs, users';
     RAISE NOTICE '📈 Indexes created: 9 optimized indexes';
     RAISE NOTICE '🔐 RLS Policies: Enabled for all tables';
-    RAISE NOTICE '⚙️  Functions: get_decision_breakdown, check_policy_conflicts';
+    RAISE NOTICE '⚙️  Functions: get_decision_breakdown, check_policy_conflicts, check_policy_conflicts_batch';
     RAISE NOTICE '🔄 Triggers: Automatic updated_at on policies and users';
     RAISE NOTICE '📋 Sample data: 3 policies, 3 audit logs, 1 admin user';
     RAISE NOTICE '';
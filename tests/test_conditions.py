@@ -0,0 +1,61 @@
+"""
+Condition validation and evaluation in backend.core.conditions
+"""
+import unittest
+
+from backend.core.conditions import (
+    UnsafeConditionError,
+    build_condition_scope,
+    compile_condition,
+    evaluate_condition,
+)
+
+
+def evaluate(source: str, tool_arguments=None, user_context=None) -> bool:
+    return evaluate_condition(
+        compile_condition(source), build_condition_scope(tool_arguments, user_context)
+    )
+
+
+class RepetitionGuardTests(unittest.TestCase):
+    def assertRejected(self, source: str):
+        with self.assertRaises(UnsafeConditionError):
+            compile_condition(source)
+
+    def test_nested_repetition_through_calls_is_rejected(self):
+        self.assertRejected('("x".upper() * 9999).upper() * 9999')
+        self.assertRejected("str(str(tool_arguments) * 9999) * 9999")
+
+    def test_literal_repetition_is_rejected(self):
+        self.assertRejected('"a" * 999999999')
+        self.assertRejected("[0] * 10")
+
+    def test_lookup_repetition_is_bounded(self):
+        self.assertRejected("tool_arguments.get('s') * 100000")
+        self.assertRejected("tool_arguments.get('s') * 100 * 100")
+        self.assertRejected("user_context.get('a', 0) * user_context.get('b', 0) > 1")
+
+    def test_numeric_multiplication_is_allowed(self):
+        self.assertTrue(evaluate("tool_arguments.get('amount', 0) * 1.5 > 100", {"amount": 70}))
+        self.assertFalse(evaluate("user_context.get('n', 0) * 2 > 10", user_context={"n": 5}))
+        self.assertTrue(evaluate("len(tool_arguments) * 2 == 4", {"a": 1, "b": 2}))
+        self.assertTrue(evaluate("(1 + 2) * 3 == 9"))
+
+
+class ConditionEvaluationTests(unittest.TestCase):
+    def test_sample_policy_condition(self):
+        source = (
+            "any(pii in lower(str(tool_arguments.get('message_content', ''))) "
+            "for pii in ['ssn', 'password'])"
+        )
+        self.assertTrue(evaluate(source, {"message_content": "my SSN is 1"}))
+        self.assertFalse(evaluate(source, {"message_content": "hello"}))
+
+    def test_disallowed_syntax_is_rejected(self):
+        for source in ("__import__('os')", "tool_arguments.__class__", "2 ** 10", "lambda: 1"):
+            with self.subTest(source=source), self.assertRaises(UnsafeConditionError):
+                compile_condition(source)
+
+
+if __name__ == "__main__":
+    unittest.main()
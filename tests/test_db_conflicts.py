@@ -0,0 +1,88 @@
+"""
+Python conflict-check fallback in DatabaseService: the literal-prefix
+index must only skip policies that cannot overlap the new rule
+"""
+import unittest
+
+from backend.services.db import DatabaseService, _literal_prefix
+
+
+def policy(policy_id, rule_id, target_tool_regex, action):
+    return {
+        "id": policy_id,
+        "name": f"Policy {rule_id}",
+        "is_active": True,
+        "rules": {
+            "rule_id": rule_id,
+            "target_tool_regex": target_tool_regex,
+            "severity": "HIGH",
+            "action_on_violation": action,
+        },
+    }
+
+
+POLICIES = [
+    policy(1, "SL-001", "Slack_API_.*", "ALLOW"),
+    policy(2, "SL-002", "^Slack_.*", "ALLOW"),
+    policy(3, "AL-001", ".*", "ALLOW"),
+    policy(4, "DB-001", "DB_Write", "ALLOW"),
+    policy(5, "SL-003", "Slack_API_PostMessage", "ALLOW"),
+    policy(6, "EM-001", "Email_.*", "ALLOW"),
+    policy(7, "SL-004", "Slack_API_.*", "BLOCK"),
+]
+
+
+class FailingRPC:
+    """Supabase stand-in whose RPC is unavailable, forcing the Python fallback"""
+
+    def rpc(self, *args, **kwargs):
+        raise RuntimeError("rpc unavailable")
+
+
+class ConflictIndexTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        DatabaseService._instance = None
+        self.service = DatabaseService()
+        self.service.supabase = FailingRPC()
+
+        async def get_active_policies():
+            return POLICIES
+
+        self.service.get_active_policies = get_active_policies
+
+    def test_literal_prefix(self):
+        self.assertEqual(_literal_prefix("^Slack_API_.*"), "Slack_API_")
+        self.assertEqual(_literal_prefix("Slack_API_Post?"), "Slack_API_Pos")
+        self.assertEqual(_literal_prefix("Slack|Email"), "")
+        self.assertEqual(_literal_prefix(".*"), "")
+
+    async def test_candidates_are_compatible_prefixes(self):
+        await self.service._get_active_policies_cached()
+        candidates = {p["rules"]["rule_id"] for p in self.service._conflict_candidates("Slack_API_Post.*")}
+        self.assertEqual(candidates, {"SL-001", "SL-002", "AL-001", "SL-003", "SL-004"})
+
+    async def test_index_matches_full_scan(self):
+        new_rule = {"rule_id": "NW-001", "target_tool_regex": "Slack_API_Post.*", "action_on_violation": "BLOCK"}
+        conflicts = await self.service.check_policy_conflicts_batch([new_rule])
+
+        # Full scan, skipping only policies whose literal prefix can't overlap
+        new_prefix = _literal_prefix(new_rule["target_tool_regex"])
+        expected = []
+        for p in POLICIES:
+            existing_regex = p["rules"]["target_tool_regex"]
+            prefix = _literal_prefix(existing_regex)
+            if not (prefix.startswith(new_prefix) or new_prefix.startswith(prefix)):
+                continue
+            if self.service._regexes_overlap_improved(
+                new_rule["target_tool_regex"], existing_regex
+            ) and self.service._actions_conflict("BLOCK", p["rules"]["action_on_violation"]):
+                expected.append(p["rules"]["rule_id"])
+        self.assertCountEqual([c["rule_id"] for c in conflicts], expected)
+        self.assertTrue(expected)
+        for conflict in conflicts:
+            self.assertEqual(conflict["new_rule_id"], "NW-001")
+            self.assertIn("description", conflict)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,253 @@
+"""
+Decision paths in ReasoningEngine: local condition evaluation, LLM
+coalescing and caching, and the batched LLM dispatcher
+"""
+import asyncio
+import json
+import unittest
+
+from backend.core import jsonutil
+from backend.core.engine import ReasoningEngine
+from backend.schemas.models import DecisionEnum, InterceptedAction, LLMBatchDecisionOutput
+
+
+def policy(policy_id, rule_id, target_tool_regex, condition_logic, action="BLOCK", severity="HIGH"):
+    return {
+        "id": policy_id,
+        "name": f"Policy {rule_id}",
+        "is_active": True,
+        "rules": {
+            "rule_id": rule_id,
+            "description": f"Test rule {rule_id} description",
+            "target_tool_regex": target_tool_regex,
+            "condition_logic": condition_logic,
+            "severity": severity,
+            "action_on_violation": action,
+        },
+    }
+
+
+MESSAGE = "str(tool_arguments.get('message', ''))"
+
+POLICIES = [
+    # chat.*: one local BLOCK, one local FLAG and one rule only the LLM can judge
+    policy(1, "CB-001", "^chat\\.", f"'ssn' in lower({MESSAGE})"),
+    policy(2, "CF-001", "^chat\\.", f"len({MESSAGE}) > 20", action="FLAG", severity="LOW"),
+    policy(3, "CL-001", "^chat\\.", f"is_abusive({MESSAGE})"),
+    # slack.*: local rules only
+    policy(4, "SB-001", "slack.*", f"'password' in lower({MESSAGE})"),
+    # email.*: LLM only
+    policy(5, "EL-001", "^email\\.", "is_rude(tool_arguments.get('body'))"),
+]
+
+
+class FakeProvider:
+    """Stub LLM: BLOCKs actions whose arguments mention "secret", allows the rest"""
+
+    def __init__(self):
+        self.calls = []
+        self.drop_ids = set()  # action_ids left out of batched replies
+
+    @staticmethod
+    def verdict(action):
+        if "secret" in json.dumps(action["tool_arguments"]):
+            return {"decision": "BLOCK", "rationale": "Secret in arguments", "severity": "HIGH",
+                    "applied_rules": action.get("rule_ids", [])}
+        return {"decision": "ALLOW", "rationale": "No rule violated", "severity": None,
+                "applied_rules": action.get("rule_ids", [])}
+
+    async def invoke_stream(self, prompt, response_schema=None, **kwargs):
+        self.calls.append(response_schema)
+        await asyncio.sleep(0.01)
+        actions = jsonutil.loads(prompt.split("```json\n", 1)[1].split("\n```", 1)[0])
+        if response_schema is LLMBatchDecisionOutput:
+            reply = {
+                "results": [
+                    dict(self.verdict(action), action_id=action["action_id"])
+                    for action in actions
+                    if action["action_id"] not in self.drop_ids
+                ]
+            }
+        else:
+            reply = self.verdict(actions)
+        yield json.dumps(reply)
+
+    async def close(self):
+        pass
+
+
+class FakeDB:
+    def __init__(self, policies):
+        self.policies = policies
+        self.logs = []
+
+    async def get_active_policies(self):
+        return self.policies
+
+    async def log_audit(self, **record):
+        self.logs.append(record)
+        return True
+
+    async def log_audit_many(self, records):
+        self.logs.extend(records)
+        return True
+
+
+class FakeNotify:
+    def __init__(self):
+        self.alerts = []
+
+    async def send_immediate_alert(self, payload):
+        self.alerts.append(payload)
+
+
+def action(action_id, tool, **tool_arguments):
+    return InterceptedAction(
+        action_id=action_id, source_agent="agent-1", target_tool=tool, tool_arguments=tool_arguments
+    )
+
+
+class EngineTestCase(unittest.IsolatedAsyncioTestCase):
+    engine_options = {}
+
+    async def asyncSetUp(self):
+        self.provider = FakeProvider()
+        self.engine = ReasoningEngine(**self.engine_options)
+        self.engine.llm_provider = self.provider
+        self.engine.db_service = FakeDB(POLICIES)
+        self.engine.notify_service = FakeNotify()
+        self.assertTrue(await self.engine._load_active_policies())
+
+    async def asyncTearDown(self):
+        await self.engine.close()
+
+
+class LocalEvaluationTests(EngineTestCase):
+    async def test_local_block_skips_llm(self):
+        decision = await self.engine.process_action(action("a1", "chat.post", message="my SSN"))
+        self.assertEqual(decision.decision, DecisionEnum.BLOCK)
+        self.assertEqual(decision.applied_rules, ["CB-001"])
+        self.assertEqual(self.provider.calls, [])
+
+    async def test_no_condition_fired_without_llm_rules_allows(self):
+        decision = await self.engine.process_action(action("a1", "slack.post", message="hi"))
+        self.assertEqual(decision.decision, DecisionEnum.ALLOW)
+        self.assertEqual(decision.applied_rules, ["SB-001"])
+        self.assertEqual(self.provider.calls, [])
+
+    async def test_tool_without_policies_allows(self):
+        decision = await self.engine.process_action(action("a1", "calendar.read"))
+        self.assertEqual(decision.decision, DecisionEnum.ALLOW)
+        self.assertEqual(decision.applied_rules, [])
+        self.assertEqual(self.provider.calls, [])
+
+    async def test_local_flag_survives_llm_allow(self):
+        decision = await self.engine.process_action(
+            action("a1", "chat.post", message="a perfectly polite long message")
+        )
+        self.assertEqual(decision.decision, DecisionEnum.FLAG)
+        self.assertEqual(decision.applied_rules, ["CF-001"])
+        self.assertEqual(len(self.provider.calls), 1)
+
+    async def test_llm_block_overrides_local_flag(self):
+        decision = await self.engine.process_action(
+            action("a1", "chat.post", message="a long message with a secret inside")
+        )
+        self.assertEqual(decision.decision, DecisionEnum.BLOCK)
+        self.assertEqual(len(self.provider.calls), 1)
+
+
+class CoalescingTests(EngineTestCase):
+    async def test_concurrent_duplicates_share_one_call(self):
+        decisions = await asyncio.gather(
+            *(self.engine.process_action(action(f"a{i}", "email.send", body="hello")) for i in range(3))
+        )
+        self.assertEqual(len(self.provider.calls), 1)
+        self.assertEqual([d.action_id for d in decisions], ["a0", "a1", "a2"])
+        self.assertTrue(all(d.decision == DecisionEnum.ALLOW for d in decisions))
+
+    async def test_recent_decision_is_reused_and_restamped(self):
+        first = await self.engine.process_action(action("a1", "email.send", body="hello"))
+        second = await self.engine.process_action(action("a2", "email.send", body="hello"))
+        self.assertEqual(len(self.provider.calls), 1)
+        self.assertEqual((first.action_id, second.action_id), ("a1", "a2"))
+        self.assertEqual(second.decision, first.decision)
+
+    async def test_different_arguments_are_not_shared(self):
+        await self.engine.process_action(action("a1", "email.send", body="hello"))
+        decision = await self.engine.process_action(action("a2", "email.send", body="secret"))
+        self.assertEqual(len(self.provider.calls), 2)
+        self.assertEqual(decision.decision, DecisionEnum.BLOCK)
+
+
+class UncachedViolationTests(EngineTestCase):
+    engine_options = {"cache_violations": False}
+
+    async def test_violations_are_not_cached(self):
+        await self.engine.process_action(action("a1", "email.send", body="secret"))
+        await self.engine.process_action(action("a2", "email.send", body="secret"))
+        self.assertEqual(len(self.provider.calls), 2)
+
+        await self.engine.process_action(action("a3", "email.send", body="hello"))
+        await self.engine.process_action(action("a4", "email.send", body="hello"))
+        self.assertEqual(len(self.provider.calls), 3)
+
+
+class BatcherTests(EngineTestCase):
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        self.engine._llm_batcher = asyncio.create_task(self.engine._run_llm_batcher())
+
+    async def test_batched_results_are_split_by_action_id(self):
+        decisions = await asyncio.gather(
+            self.engine.process_action(action("a1", "email.send", body="one")),
+            self.engine.process_action(action("a2", "email.send", body="a secret")),
+            self.engine.process_action(action("a3", "email.send", body="three")),
+        )
+        self.assertEqual(self.provider.calls, [LLMBatchDecisionOutput])
+        self.assertEqual(
+            [(d.action_id, d.decision) for d in decisions],
+            [("a1", DecisionEnum.ALLOW), ("a2", DecisionEnum.BLOCK), ("a3", DecisionEnum.ALLOW)],
+        )
+
+    async def test_missing_batched_result_falls_back_to_single_call(self):
+        self.provider.drop_ids.add("a2")
+        decisions = await asyncio.gather(
+            self.engine.process_action(action("a1", "email.send", body="one")),
+            self.engine.process_action(action("a2", "email.send", body="a secret")),
+        )
+        self.assertEqual(self.provider.calls[0], LLMBatchDecisionOutput)
+        self.assertEqual(len(self.provider.calls), 2)
+        self.assertEqual(
+            [(d.action_id, d.decision) for d in decisions],
+            [("a1", DecisionEnum.ALLOW), ("a2", DecisionEnum.BLOCK)],
+        )
+
+
+class BinningTests(EngineTestCase):
+    async def test_size_classes(self):
+        size_class = ReasoningEngine._action_size_class
+        self.assertEqual(size_class(action("a1", "email.send", body="x")), 0)
+        self.assertEqual(size_class(action("a1", "email.send", body="x" * 600)), 1)
+        self.assertEqual(size_class(action("a1", "email.send", body="x" * 5000)), 2)
+
+    async def test_bins_group_by_rule_set_and_size(self):
+        chat_rules = await self.engine._get_relevant_policies("chat.post")
+        email_rules = await self.engine._get_relevant_policies("email.send")
+        items = [
+            (action("c1", "chat.post", message="x"), chat_rules, None),
+            (action("c2", "chat.post", message="y"), chat_rules, None),
+            (action("e1", "email.send", body="x"), email_rules, None),
+            (action("e2", "email.send", body="x" * 5000), email_rules, None),
+            (action("c3", "chat.post", message="x" * 5000), chat_rules, None),
+        ]
+        bins = [
+            sorted(item[0].action_id for item in group)
+            for group in self.engine._bin_llm_batch(items)
+        ]
+        # Shared rule set and size class together; singletons mixed per size class
+        self.assertCountEqual(bins, [["c1", "c2"], ["e1"], ["c3", "e2"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
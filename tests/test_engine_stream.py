@@ -0,0 +1,48 @@
+"""
+Streaming early-exit in ReasoningEngine._call_llm_with_retry
+"""
+import unittest
+
+from backend.core.engine import ReasoningEngine
+from backend.schemas.models import LLMBatchDecisionOutput
+
+DECISION = '{"decision": "ALLOW", "rationale": "No rule violated", "applied_rules": ["DP-001"]}'
+
+
+class StreamingProvider:
+    """Fake provider that streams a fixed reply in small chunks"""
+
+    def __init__(self, reply: str):
+        self.reply = reply
+
+    async def invoke_stream(self, **kwargs):
+        for i in range(0, len(self.reply), 5):
+            yield self.reply[i:i + 5]
+
+
+class ReadLLMStreamTests(unittest.IsolatedAsyncioTestCase):
+    async def call(self, reply: str, **kwargs) -> str:
+        engine = ReasoningEngine()
+        engine.llm_provider = StreamingProvider(reply)
+        response = await engine._call_llm_with_retry(prompt="p", system_prompt="s", **kwargs)
+        return response.content
+
+    async def test_single_call_skips_leading_bracketed_list(self):
+        content = await self.call(f'Applied rules ["DP-001"]: {DECISION} trailing text')
+        self.assertEqual(content, DECISION)
+
+    async def test_single_call_stops_after_first_object(self):
+        content = await self.call(f"{DECISION} and some more tokens")
+        self.assertEqual(content, DECISION)
+
+    async def test_batched_call_accepts_bare_array(self):
+        content = await self.call(
+            f"[{DECISION}] trailing text",
+            response_schema=LLMBatchDecisionOutput,
+            json_openers="{[",
+        )
+        self.assertEqual(content, f"[{DECISION}]")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,30 @@
+"""
+JSON recovery from LLM text in backend.core.jsonutil.extract_object
+"""
+import unittest
+
+from backend.core.jsonutil import extract_object
+
+DECISION = '{"decision": "ALLOW", "rationale": "No rule violated"}'
+
+
+class ExtractObjectTests(unittest.TestCase):
+    def test_skips_balanced_spans_that_do_not_parse(self):
+        self.assertEqual(extract_object(f"Rules {{DP-001}} apply. {DECISION} done"), DECISION)
+        self.assertEqual(extract_object("{a}" * 1000 + DECISION), DECISION)
+
+    def test_brackets_inside_strings_are_ignored(self):
+        self.assertEqual(extract_object('x {"a": "}{"} y'), '{"a": "}{"}')
+
+    def test_array_only_with_bracket_opener(self):
+        self.assertEqual(extract_object(f"[1] {DECISION}"), DECISION)
+        self.assertEqual(extract_object(f"[{DECISION}] tail", openers="{["), f"[{DECISION}]")
+
+    def test_unterminated_value_ends_the_search(self):
+        # A truncated reply must not yield one of its nested objects
+        self.assertIsNone(extract_object('{"results": [{"decision": "ALLOW"}'))
+        self.assertIsNone(extract_object("no json here"))
+
+
+if __name__ == "__main__":
+    unittest.main()
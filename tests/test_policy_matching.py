@@ -0,0 +1,177 @@
+"""
+Tool-to-policy matching in ReasoningEngine._get_relevant_policies: the
+literal-prefix trie, the RE2 set, the combined regex and unfused patterns
+must together match exactly what each pattern's match() would
+"""
+import unittest
+from unittest import mock
+
+from backend.core import engine as engine_module
+from backend.core.engine import ReasoningEngine
+
+
+def policy(policy_id, rule_id, target_tool_regex):
+    return {
+        "id": policy_id,
+        "name": f"Policy {rule_id}",
+        "is_active": True,
+        "rules": {
+            "rule_id": rule_id,
+            "description": f"Test rule {rule_id} description",
+            "target_tool_regex": target_tool_regex,
+            "condition_logic": "True",
+            "severity": "HIGH",
+            "action_on_violation": "BLOCK",
+        },
+    }
+
+
+POLICIES = [
+    policy(1, "TL-001", "slack.*"),                  # literal prefix -> trie
+    policy(2, "TL-002", "^db\\.(write|delete)"),     # literal alternation -> trie
+    policy(3, "TL-003", "slack"),                    # same trie node as TL-001
+    policy(4, "CX-001", ".*_admin$"),                # RE2 set / combined regex
+    policy(5, "CX-002", "(?=.*exec)run\\..*"),       # lookahead: not RE2
+    policy(6, "CX-003", "(ab)\\1.*"),                # backreference: unfused
+    policy(7, "CX-004", "(?i)email\\..*"),           # global flag: unfused
+    policy(8, "CX-005", "foo[("),                    # invalid: substring fallback
+    policy(9, "CX-006", ".*"),                       # matches every tool
+    policy(10, "TL-004", "^db\\.write"),             # shares a pattern prefix with TL-002
+    policy(11, "TL-005", "slack.*"),                 # same pattern as TL-001
+]
+
+TOOLS = [
+    "slack", "slack.post", "slac", "db.write", "db.delete", "db.read", "db.writer",
+    "user_admin", "user_admin2", "run.exec", "run.read", "abab", "abab.x", "ab",
+    "EMAIL.send", "email.send", "xfoo[(bar", "", "unknown.tool",
+]
+
+
+def expected_rule_ids(engine, tool):
+    """Brute force: every cached pattern, in index order"""
+    return [
+        entry["rule"].rule_id
+        for pattern, entries in engine._policy_cache
+        if pattern.match(tool)
+        for entry in entries
+    ]
+
+
+class FakeDB:
+    def __init__(self, policies):
+        self.policies = policies
+
+    async def get_active_policies(self):
+        return self.policies
+
+
+class PolicyMatchingTests(unittest.IsolatedAsyncioTestCase):
+    async def load(self, policies=POLICIES) -> ReasoningEngine:
+        engine = ReasoningEngine()
+        engine.db_service = FakeDB(policies)
+        self.assertTrue(await engine._load_active_policies())
+        return engine
+
+    async def assertMatchesBruteForce(self, engine):
+        for tool in TOOLS:
+            with self.subTest(tool=tool):
+                relevant = await engine._get_relevant_policies(tool)
+                self.assertEqual(
+                    [entry["rule"].rule_id for entry in relevant], expected_rule_ids(engine, tool)
+                )
+                # Second lookup comes from the per-tool caches
+                self.assertIs(await engine._get_relevant_policies(tool), relevant)
+
+    async def test_matches_brute_force(self):
+        engine = await self.load()
+        self.assertTrue(engine._prefix_trie)
+        self.assertTrue(engine._unfused_patterns)
+        await self.assertMatchesBruteForce(engine)
+
+    async def test_matches_brute_force_without_re2(self):
+        with mock.patch.object(engine_module, "RE2_AVAILABLE", False):
+            engine = await self.load()
+        self.assertIsNone(engine._pattern_set)
+        self.assertIsNotNone(engine._combined_re)
+        await self.assertMatchesBruteForce(engine)
+
+    @unittest.skipUnless(engine_module.RE2_AVAILABLE, "google-re2 not installed")
+    async def test_re2_set_takes_supported_patterns(self):
+        engine = await self.load()
+        in_set = {engine._policy_cache[idx][0].pattern for idx in engine._pattern_set_indices}
+        self.assertIn(".*_admin$", in_set)
+        self.assertNotIn("(?=.*exec)run\\..*", in_set)
+        await self.assertMatchesBruteForce(engine)
+
+    async def test_identical_patterns_share_one_entry_list(self):
+        engine = await self.load()
+        rule_ids = [entry["rule"].rule_id for entry in await engine._get_relevant_policies("slack.x")]
+        self.assertEqual(rule_ids.count("TL-001") + rule_ids.count("TL-005"), 2)
+        self.assertEqual(len([p for p, _ in engine._policy_cache if p.pattern == "slack.*"]), 1)
+
+    async def test_invalid_regex_falls_back_to_substring(self):
+        engine = await self.load([policy(1, "CX-005", "foo[(")])
+        self.assertEqual(len(await engine._get_relevant_policies("xfoo[(bar")), 1)
+        self.assertEqual(await engine._get_relevant_policies("foo"), [])
+
+    async def test_unmatched_tool_is_negatively_cached(self):
+        engine = await self.load([policy(1, "TL-001", "slack.*")])
+        self.assertEqual(await engine._get_relevant_policies("github.push"), [])
+        self.assertIn("github.push", engine._no_policy_tools)
+
+
+class AddPoliciesTests(unittest.IsolatedAsyncioTestCase):
+    """Rules merged by add_policies match the same tools as a full load of the same rows"""
+
+    load = PolicyMatchingTests.load
+
+    async def assertEquivalentToFullLoad(self, base, added_batches):
+        engine = await self.load(base)
+        # Warm the per-tool caches so stale entries would show up
+        for tool in TOOLS:
+            await engine._get_relevant_policies(tool)
+
+        for batch in added_batches:
+            await engine.add_policies(batch)
+
+        reference = await self.load(base + [p for batch in added_batches for p in batch])
+        for tool in TOOLS:
+            with self.subTest(tool=tool):
+                self.assertEqual(
+                    [entry["rule"].rule_id for entry in await engine._get_relevant_policies(tool)],
+                    [entry["rule"].rule_id for entry in await reference._get_relevant_policies(tool)],
+                )
+        return engine
+
+    async def test_incremental_add_matches_full_load(self):
+        engine = await self.assertEquivalentToFullLoad(
+            POLICIES[:3], [POLICIES[3:6], POLICIES[6:9], POLICIES[9:]]
+        )
+        # Merged in place, not rebuilt
+        self.assertGreater(engine._incremental_patterns, 0)
+
+    async def test_add_past_pattern_limit_rebuilds(self):
+        with mock.patch.object(engine_module, "_INCREMENTAL_PATTERN_LIMIT", 1):
+            engine = await self.assertEquivalentToFullLoad(
+                POLICIES[:3], [[p] for p in POLICIES[3:]]
+            )
+        # Six non-trie patterns were added one by one, so merges hit the limit
+        self.assertLessEqual(engine._incremental_patterns, 1)
+
+    async def test_replacing_a_loaded_row_matches_full_load(self):
+        replacement = policy(1, "TL-001", "github.*")
+        engine = await self.load(POLICIES)
+        await engine._get_relevant_policies("slack.post")
+        await engine.add_policies([replacement])
+
+        reference = await self.load([replacement] + POLICIES[1:])
+        for tool in TOOLS + ["github.push"]:
+            with self.subTest(tool=tool):
+                self.assertCountEqual(
+                    [entry["rule"].rule_id for entry in await engine._get_relevant_policies(tool)],
+                    [entry["rule"].rule_id for entry in await reference._get_relevant_policies(tool)],
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()